@@ -0,0 +1,213 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bump when the metrics change so stored values can be told apart
+ACOUSTICS_VERSION = "1"
+
+# Analysis window and hop of the energy VAD
+FRAME_SECONDS = 0.03
+HOP_SECONDS = 0.01
+# Frames louder than the noise floor by this margin are speech
+SPEECH_MARGIN_DB = 12.0
+# Frames quieter than this are always silence, whatever the noise floor
+ABSOLUTE_FLOOR_DB = -55.0
+# Silences shorter than this are part of speech (stops, breaths between words)
+MIN_PAUSE_SECONDS = 0.3
+# Speech bursts shorter than this are clicks or noise
+MIN_SPEECH_SECONDS = 0.1
+
+
+def frame_energy_db(samples, sample_rate):
+    '''
+    This function returns the RMS level of every analysis frame in dBFS.
+    '''
+    frame_length = int(FRAME_SECONDS * sample_rate)
+    hop_length = int(HOP_SECONDS * sample_rate)
+    if len(samples) < frame_length:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = sliding_window_view(samples, frame_length)[::hop_length]
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def extend_frame_energy(energy_db, samples, sample_rate):
+    '''
+    This function appends the energy of the frames that became complete since
+    energy_db was computed, so a growing recording is only analyzed once.
+    Args:
+        energy_db (np.ndarray): Frame energies of an earlier, shorter version of samples.
+        samples (np.ndarray): The recording so far.
+    Returns:
+        np.ndarray: The same frame energies frame_energy_db returns for all of samples.
+    '''
+    frame_length = int(FRAME_SECONDS * sample_rate)
+    hop_length = int(HOP_SECONDS * sample_rate)
+    if len(samples) < frame_length:
+        return energy_db
+
+    total_frames = (len(samples) - frame_length) // hop_length + 1
+    done = len(energy_db)
+    if total_frames <= done:
+        return energy_db
+    new_frames = frame_energy_db(samples[done * hop_length:(total_frames - 1) * hop_length + frame_length], sample_rate)
+    return np.concatenate((energy_db, new_frames))
+
+
+def runs(mask):
+    '''
+    This function returns the [start, end) frame ranges where a boolean mask is True.
+    '''
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges.reshape(-1, 2)
+
+
+def speech_mask(energy_db):
+    '''
+    This function labels frames as speech with an adaptive energy threshold and
+    removes pauses and speech bursts that are too short to count.
+    '''
+    if not len(energy_db):
+        return np.zeros(0, dtype=bool)
+
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = max(noise_floor + SPEECH_MARGIN_DB, ABSOLUTE_FLOOR_DB)
+    mask = energy_db > threshold
+
+    min_pause_frames = int(MIN_PAUSE_SECONDS / HOP_SECONDS)
+    for start, end in runs(~mask):
+        # Short gaps inside speech are closed, leading and trailing silence is kept
+        if end - start < min_pause_frames and start > 0 and end < len(mask):
+            mask[start:end] = True
+
+    min_speech_frames = int(MIN_SPEECH_SECONDS / HOP_SECONDS)
+    for start, end in runs(mask):
+        if end - start < min_speech_frames:
+            mask[start:end] = False
+    return mask
+
+
+def compute_acoustic_metrics(samples, sample_rate, transcript=None):
+    '''
+    This function measures pauses, speech/silence balance and speaking rate of a clip.
+    Args:
+        samples (np.ndarray): Mono float32 PCM.
+        sample_rate (int): Sample rate of samples.
+        transcript (str): Transcript of the clip, needed for the word based rates.
+    Returns:
+        dict: Deterministic metrics, durations in seconds.
+    '''
+    duration = len(samples) / sample_rate if sample_rate else 0.0
+    return metrics_from_energy(frame_energy_db(samples, sample_rate), duration, transcript)
+
+
+def metrics_from_energy(energy_db, duration, transcript=None):
+    '''
+    This function derives the acoustic metrics from frame energies computed
+    earlier, e.g. incrementally while an answer is streamed.
+    Args:
+        energy_db (np.ndarray): Frame energies from frame_energy_db or extend_frame_energy.
+        duration (float): Length of the clip in seconds.
+        transcript (str): Transcript of the clip, needed for the word based rates.
+    Returns:
+        dict: The metrics of compute_acoustic_metrics.
+    '''
+    mask = speech_mask(energy_db)
+
+    speech_runs = runs(mask)
+    speech_seconds = float(mask.sum() * HOP_SECONDS)
+
+    # Pauses are the silences between the first and the last word
+    pause_durations = []
+    if len(speech_runs) > 1:
+        gaps = speech_runs[1:, 0] - speech_runs[:-1, 1]
+        pause_durations = [round(float(gap * HOP_SECONDS), 2) for gap in gaps]
+    speaking_span = float((speech_runs[-1, 1] - speech_runs[0, 0]) * HOP_SECONDS) if len(speech_runs) else 0.0
+    silence_seconds = max(duration - speech_seconds, 0.0)
+
+    word_count = len(transcript.split()) if transcript else None
+    words_per_minute = None
+    articulation_rate = None
+    if word_count is not None and speaking_span > 0:
+        # Over the whole answer, and over the time actually spent talking
+        words_per_minute = round(word_count / speaking_span * 60, 1)
+        articulation_rate = round(word_count / speech_seconds * 60, 1) if speech_seconds else None
+
+    return {
+        'version': ACOUSTICS_VERSION,
+        'duration_seconds': round(duration, 2),
+        'speech_seconds': round(speech_seconds, 2),
+        'silence_seconds': round(silence_seconds, 2),
+        'speech_ratio': round(speech_seconds / duration, 3) if duration else 0.0,
+        'speech_to_silence_ratio': round(speech_seconds / silence_seconds, 3) if silence_seconds else None,
+        'pause_count': len(pause_durations),
+        'pause_durations': pause_durations,
+        'mean_pause_seconds': round(float(np.mean(pause_durations)), 2) if pause_durations else 0.0,
+        'longest_pause_seconds': max(pause_durations) if pause_durations else 0.0,
+        'word_count': word_count,
+        'words_per_minute': words_per_minute,
+        'articulation_rate': articulation_rate
+    }
+
+
+# Per-question graph series that can be read straight from the stored metrics
+ACOUSTIC_GRAPH_SERIES = ('pause_count', 'words_per_minute', 'speech_ratio')
+
+
+def acoustic_graph_data(feedbacks):
+    '''
+    This function builds trend graph series from the acoustic metrics stored with each feedback.
+    Args:
+        feedbacks (list): Assessment feedbacks in question order.
+    Returns:
+        dict: Series name to per-question values, only series every feedback can fill.
+    '''
+    metrics = [feedback.get('acoustic_metrics') for feedback in feedbacks]
+    if not metrics or any(item is None for item in metrics):
+        return {}
+
+    graph_data = {}
+    for name in ACOUSTIC_GRAPH_SERIES:
+        values = [item.get(name) for item in metrics]
+        if all(value is not None for value in values):
+            graph_data[name] = values
+    return graph_data
+
+
+# Per-question series read from the structured feedback of each answer, section and field
+FEEDBACK_GRAPH_SERIES = {
+    'speaking_rate': ('speaking_rate', 'rate'),
+    'filler_word_count': ('filler_word_usage', 'count'),
+    'pause_count': ('pause_pattern', 'count'),
+}
+
+
+def measured_graph_data(feedbacks):
+    '''
+    This function builds the numeric trend series without a model call: the counts
+    and ratings stored with each assessment, replaced by the acoustic measurements
+    where every feedback has them.
+    Args:
+        feedbacks (list): Assessment feedbacks in question order.
+    Returns:
+        dict: Series name to per-question values, only series every feedback can fill.
+    '''
+    graph_data = {}
+    for name, (section, field) in FEEDBACK_GRAPH_SERIES.items():
+        values = []
+        for feedback in feedbacks:
+            value = feedback.get(section)
+            values.append(value.get(field) if isinstance(value, dict) else None)
+        if values and all(isinstance(value, (int, float)) for value in values):
+            graph_data[name] = values
+
+    graph_data.update(acoustic_graph_data(feedbacks))
+    return graph_data
+
+
+def measure_decoded_audio(audio, transcript=None):
+    '''
+    This function computes the acoustic metrics of a DecodedAudio, decoding it if no consumer has yet.
+    '''
+    return compute_acoustic_metrics(audio.samples, audio.sample_rate, transcript)
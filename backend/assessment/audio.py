@@ -1,10 +1,246 @@
-from transformers import pipeline
+import threading
+import time
+from decouple import config
+from assessment.audio_decode import DecodedAudio
 
-model_path = "hindi_models/whisper-medium-hi_alldata_multigpu"
-device = "cuda"
-lang_code = "hi"
+# ASR settings, the defaults keep the original Hindi Whisper model
+model_path = config('ASR_MODEL', default="hindi_models/whisper-medium-hi_alldata_multigpu")
+# Smaller model used instead of model_path when running on CPU, empty keeps model_path
+cpu_model_path = config('ASR_CPU_MODEL', default="")
+# 'auto' picks the first CUDA device when available and the CPU otherwise
+device = config('ASR_DEVICE', default="auto")
+# 'int8' applies dynamic int8 quantization to the linear layers on CPU, 'none' keeps float32
+quantization = config('ASR_QUANTIZATION', default="int8")
+lang_code = config('ASR_LANGUAGE', default="hi")
+chunk_length_s = config('ASR_CHUNK_LENGTH_S', default=30, cast=int)
+batch_size = config('ASR_BATCH_SIZE', default=4, cast=int)
+# Torch intra-op threads, 0 keeps the torch default
+num_threads = config('ASR_THREADS', default=0, cast=int)
+# After a failed load, calls fail fast for this long before loading is tried again
+load_retry_seconds = config('ASR_LOAD_RETRY_SECONDS', default=300, cast=int)
 
-whisper_asr = pipeline("automatic-speech-recognition", model=model_path, device=device)
+
+class ASREngine:
+    '''
+    Local Whisper transcription engine.
+
+    The model is loaded once per process on first use. On CPU it can run a
+    smaller checkpoint and int8 dynamically quantized linear layers, which is
+    what makes transcription feasible on nodes without a GPU.
+    '''
+
+    def __init__(self, model_path, cpu_model_path="", device="auto", quantization="int8",
+                 language="hi", chunk_length_s=30, batch_size=4, num_threads=0, load_retry_seconds=300):
+        self.model_path = model_path
+        self.cpu_model_path = cpu_model_path
+        self.requested_device = device
+        self.quantization = quantization
+        self.language = language
+        self.chunk_length_s = chunk_length_s
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.load_retry_seconds = load_retry_seconds
+
+        self.device = None
+        self.loaded_model = None
+        self.load_time = None
+        # Set when loading failed, calls fail fast until load_retry_seconds have passed
+        self.load_error = None
+        self._load_failed_at = None
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+
+    def resolve_device(self):
+        '''
+        This function resolves the 'auto' device to cuda:0 or cpu.
+        Returns:
+            str: The torch device the model runs on.
+        '''
+        import torch
+
+        if self.requested_device != "auto":
+            return self.requested_device
+        return "cuda:0" if torch.cuda.is_available() else "cpu"
+
+    def load(self):
+        '''
+        This function builds the ASR pipeline if it is not loaded yet.
+        Concurrent callers wait for a single load instead of each loading the model.
+        Returns:
+            float: Seconds spent loading, 0 if it was already loaded.
+        Raises:
+            RuntimeError: If the model could not be loaded, now or on a recent call.
+        '''
+        if self._pipeline is not None:
+            return 0.0
+
+        with self._load_lock:
+            if self._pipeline is not None:
+                return 0.0
+            # Failures can be transient (e.g. a hub download), so loading is retried after a while
+            if self.load_error is not None and time.monotonic() - self._load_failed_at < self.load_retry_seconds:
+                raise RuntimeError(f"ASR model failed to load: {self.load_error}")
+            try:
+                load_time = self._load()
+            except Exception as e:
+                self.load_error = str(e)
+                self._load_failed_at = time.monotonic()
+                raise RuntimeError(f"ASR model failed to load: {self.load_error}") from e
+            self.load_error = None
+            return load_time
+
+    def _load(self):
+        started = time.perf_counter()
+        import torch
+        from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+
+        if self.num_threads > 0:
+            torch.set_num_threads(self.num_threads)
+
+        self.device = self.resolve_device()
+        on_cpu = self.device == "cpu"
+        self.loaded_model = self.cpu_model_path if on_cpu and self.cpu_model_path else self.model_path
+
+        # Half precision only pays off on the GPU, CPU kernels are fastest in float32 / int8
+        torch_dtype = torch.float32 if on_cpu else torch.float16
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(self.loaded_model, torch_dtype=torch_dtype)
+        if on_cpu and self.quantization == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.to(self.device)
+        model.eval()
+
+        processor = AutoProcessor.from_pretrained(self.loaded_model)
+        self._pipeline = pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=self.chunk_length_s,
+            batch_size=self.batch_size,
+            torch_dtype=torch_dtype,
+            device=self.device
+        )
+
+        self.load_time = time.perf_counter() - started
+        return self.load_time
+
+    def transcribe(self, audio):
+        '''
+        This function transcribes one audio clip.
+        Args:
+            audio: A DecodedAudio, file path, raw bytes, or a float32 array sampled at the model rate.
+        Returns:
+            str: The transcribed text.
+        '''
+        import torch
+
+        self.load()
+        with torch.inference_mode():
+            transcription = self._pipeline(
+                asr_input(audio),
+                generate_kwargs={"language": self.language, "task": "transcribe"}
+            )
+        return transcription["text"]
+
+    def transcribe_batch(self, clips, batch_size=None, chunk_length_s=None):
+        '''
+        This function transcribes many clips with batched pipeline calls.
+        Long clips are split into chunk_length_s windows and the windows of all
+        clips are padded and batched together, so a whole quiz runs as a few
+        forward passes instead of one pipeline call per answer.
+        Args:
+            clips (list): Audio clips, each a DecodedAudio, file path, raw bytes, a float32
+                array at the model rate, or a {"raw": array, "sampling_rate": int} dict.
+            batch_size (int): Windows per forward pass, defaults to the engine setting.
+            chunk_length_s (int): Window length in seconds, defaults to the engine setting.
+        Returns:
+            list: One dict per clip in input order with the text, the audio
+                duration (when known) and the time spent until it was produced.
+        '''
+        import torch
+
+        if not clips:
+            return []
+
+        self.load()
+        clips = [asr_input(clip) for clip in clips]
+        # Measured up front, the pipeline consumes dict inputs while preprocessing
+        sampling_rate = self._pipeline.feature_extractor.sampling_rate
+        durations = [clip_duration(clip, sampling_rate) for clip in clips]
+        started = time.perf_counter()
+        previous = started
+        results = []
+        with torch.inference_mode():
+            # Results are yielded in input order as soon as all windows of a clip are decoded
+            outputs = self._pipeline(
+                iter(clips),
+                batch_size=batch_size or self.batch_size,
+                chunk_length_s=chunk_length_s or self.chunk_length_s,
+                generate_kwargs={"language": self.language, "task": "transcribe"}
+            )
+            for duration, output in zip(durations, outputs):
+                now = time.perf_counter()
+                results.append({
+                    "text": output["text"],
+                    "audio_seconds": duration,
+                    "processing_seconds": now - previous,
+                    "elapsed_seconds": now - started
+                })
+                previous = now
+        return results
+
+    def info(self):
+        return {
+            "model": self.loaded_model,
+            "device": self.device,
+            "quantization": self.quantization if self.device == "cpu" else "none",
+            "chunk_length_s": self.chunk_length_s,
+            "batch_size": self.batch_size,
+            "num_threads": self.num_threads,
+            "load_time": self.load_time
+        }
+
+
+def asr_input(clip):
+    '''
+    This function passes decoded uploads to the pipeline as PCM, so they are not decoded again.
+    '''
+    if isinstance(clip, DecodedAudio):
+        return clip.asr_input()
+    return clip
+
+
+def clip_duration(clip, sampling_rate):
+    '''
+    This function returns the length of an in-memory clip in seconds, None for paths and encoded bytes.
+    '''
+    if isinstance(clip, dict):
+        return len(clip["raw"]) / clip["sampling_rate"]
+    if hasattr(clip, "shape"):
+        return len(clip) / sampling_rate
+    return None
+
+
+# One engine per process, shared by every transcription in that process
+asr_engine = ASREngine(
+    model_path,
+    cpu_model_path=cpu_model_path,
+    device=device,
+    quantization=quantization,
+    language=lang_code,
+    chunk_length_s=chunk_length_s,
+    batch_size=batch_size,
+    num_threads=num_threads,
+    load_retry_seconds=load_retry_seconds
+)
+
+def load_whisper_asr():
+    '''
+    This function loads the ASR engine of this process, e.g. from the startup warm-up.
+    Returns:
+        float: Seconds spent loading, 0 if it was already loaded.
+    '''
+    return asr_engine.load()
 
 def transcribe_audio(audio_path):
     '''
@@ -14,5 +250,16 @@ def transcribe_audio(audio_path):
     Returns:
         str: The transcribed text.
     '''
-    transcription = whisper_asr(audio_path, language=lang_code)
-    return transcription["text"]
\ No newline at end of file
+    return asr_engine.transcribe(audio_path)
+
+def transcribe_batch(clips, batch_size=None, chunk_length_s=None):
+    '''
+    This function transcribes a list of audio clips, e.g. every answer of a quiz, in batches.
+    Args:
+        clips (list): Audio clips accepted by ASREngine.transcribe_batch.
+        batch_size (int): Windows per forward pass, defaults to ASR_BATCH_SIZE.
+        chunk_length_s (int): Window length in seconds, defaults to ASR_CHUNK_LENGTH_S.
+    Returns:
+        list: {"text", "audio_seconds", "processing_seconds", "elapsed_seconds"} per clip, in input order.
+    '''
+    return asr_engine.transcribe_batch(clips, batch_size=batch_size, chunk_length_s=chunk_length_s)
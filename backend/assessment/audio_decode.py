@@ -0,0 +1,197 @@
+import io
+import shutil
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+# Sample rate expected by Whisper and used for the acoustic metrics
+SAMPLE_RATE = 16000
+# ffmpeg error output kept for the error message of a failed stream
+STDERR_LIMIT_BYTES = 65536
+
+
+def ffmpeg_binary():
+    '''
+    This function returns the ffmpeg executable, preferring the system one and
+    falling back to the binary bundled with imageio-ffmpeg.
+    '''
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def decode_audio_bytes(data, sample_rate=SAMPLE_RATE):
+    '''
+    This function decodes an encoded audio file (webm/opus, wav, mp3...) to mono
+    float32 PCM by piping it through ffmpeg, without touching the filesystem.
+    Args:
+        data (bytes): The encoded audio.
+        sample_rate (int): The output sample rate.
+    Returns:
+        np.ndarray: float32 samples in [-1, 1].
+    '''
+    command = [
+        ffmpeg_binary(), "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "f32le", "pipe:1"
+    ]
+    process = subprocess.run(command, input=data, capture_output=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Could not decode audio: {process.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(process.stdout, dtype=np.float32)
+
+
+class DecodedAudio:
+    '''
+    One uploaded audio clip shared by every consumer of a request.
+
+    Holds the encoded upload for Gemini and decodes it to 16 kHz mono float32
+    PCM once, on first access of samples, for the local ASR and acoustic
+    metrics. Consumers get views of the same buffers, never copies.
+    '''
+
+    def __init__(self, data, mime_type="audio/webm", name="audio.webm", sample_rate=SAMPLE_RATE, samples=None):
+        '''
+        Args:
+            data (bytes): The encoded upload.
+            samples (np.ndarray): PCM that was already decoded, e.g. while the upload was streamed.
+        '''
+        self.data = data
+        self.mime_type = mime_type
+        self.name = name
+        self.sample_rate = sample_rate
+        self.decode_time = None
+        self._samples = samples
+        self._lock = threading.Lock()
+
+    @property
+    def samples(self):
+        if self._samples is None:
+            with self._lock:
+                if self._samples is None:
+                    started = time.perf_counter()
+                    self._samples = decode_audio_bytes(self.data, self.sample_rate)
+                    self.decode_time = time.perf_counter() - started
+        return self._samples
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    def file_buffer(self):
+        '''
+        This function returns a named in-memory file over the encoded bytes, for uploads.
+        '''
+        buffer = io.BytesIO(self.data)
+        buffer.name = self.name  # Give it a name for mime type detection
+        return buffer
+
+    def asr_input(self):
+        '''
+        This function returns the decoded samples in the input format of the ASR pipeline.
+        A new dict every call since the pipeline consumes its input dict.
+        '''
+        return {"raw": self.samples, "sampling_rate": self.sample_rate}
+
+
+class StreamingDecoder:
+    '''
+    Decodes an encoded audio stream that arrives in chunks (e.g. MediaRecorder
+    webm slices) with one long-running ffmpeg process.
+
+    Chunks are written to ffmpeg's stdin while a reader thread appends the PCM
+    it produces to a growing buffer, so decoded audio is available a fraction
+    of a second after each chunk instead of after the recording ends.
+    '''
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.process = subprocess.Popen(
+            [
+                ffmpeg_binary(), "-nostdin", "-hide_banner", "-loglevel", "error",
+                # Start decoding from the first chunk instead of probing megabytes of input
+                "-probesize", "32768", "-analyzeduration", "0",
+                "-i", "pipe:0",
+                "-vn", "-ac", "1", "-ar", str(sample_rate),
+                "-f", "f32le", "pipe:1"
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self.length = 0
+        self._buffer = np.zeros(sample_rate * 30, dtype=np.float32)
+        self._partial = b""
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+        # ffmpeg blocks, and stops reading stdin, once a full stderr pipe is not read
+        self._stderr = bytearray()
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_reader.start()
+
+    def _read(self):
+        while True:
+            data = self.process.stdout.read1(65536)
+            if not data:
+                break
+            data = self._partial + data
+            usable = len(data) - len(data) % 4
+            self._partial = data[usable:]
+            self._append(np.frombuffer(data[:usable], dtype=np.float32))
+
+    def _read_stderr(self):
+        while True:
+            data = self.process.stderr.read1(4096)
+            if not data:
+                break
+            # Only the tail is kept, a corrupt stream can log an error per packet
+            self._stderr += data
+            del self._stderr[:-STDERR_LIMIT_BYTES]
+
+    def _append(self, samples):
+        with self._lock:
+            needed = self.length + len(samples)
+            if needed > len(self._buffer):
+                # Grow geometrically, views handed out earlier keep the old buffer alive
+                buffer = np.zeros(max(needed, 2 * len(self._buffer)), dtype=np.float32)
+                buffer[:self.length] = self._buffer[:self.length]
+                self._buffer = buffer
+            self._buffer[self.length:needed] = samples
+            self.length = needed
+
+    @property
+    def samples(self):
+        '''
+        This function returns a view of the samples decoded so far.
+        '''
+        with self._lock:
+            return self._buffer[:self.length]
+
+    def write(self, chunk):
+        self.process.stdin.write(chunk)
+        self.process.stdin.flush()
+
+    def close(self):
+        '''
+        This function ends the input and waits until ffmpeg has decoded everything.
+        '''
+        if self.process.stdin.closed:
+            return
+        self.process.stdin.close()
+        self._reader.join()
+        self._stderr_reader.join()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"Could not decode audio stream: {bytes(self._stderr).decode(errors='replace').strip()}")
+
+    def kill(self):
+        '''
+        This function stops ffmpeg without waiting for the remaining output.
+        '''
+        self.process.kill()
+        self.process.wait()
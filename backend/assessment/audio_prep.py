@@ -0,0 +1,80 @@
+import subprocess
+import time
+
+import numpy as np
+from decouple import config
+
+from assessment.acoustics import frame_energy_db, speech_mask, HOP_SECONDS
+from assessment.audio_decode import DecodedAudio, ffmpeg_binary
+
+# Normalize and re-encode answers before they are uploaded to Gemini
+AUDIO_UPLOAD_PREP = config('AUDIO_UPLOAD_PREP', default=False, cast=bool)
+# Opus speech settings, opus accepts 8, 12, 16, 24 and 48 kHz
+AUDIO_UPLOAD_SAMPLE_RATE = config('AUDIO_UPLOAD_SAMPLE_RATE', default=16000, cast=int)
+AUDIO_UPLOAD_BITRATE = config('AUDIO_UPLOAD_BITRATE', default="24k")
+# Silence kept before the first and after the last detected speech
+TRIM_PADDING_SECONDS = 0.25
+
+
+def trim_silence(samples, sample_rate):
+    '''
+    This function drops leading and trailing silence, keeping a little padding around the speech.
+    Returns:
+        tuple: The trimmed view of samples and the number of seconds removed.
+    '''
+    mask = speech_mask(frame_energy_db(samples, sample_rate))
+    speech_frames = np.flatnonzero(mask)
+    if not len(speech_frames):
+        return samples, 0.0
+
+    hop = HOP_SECONDS * sample_rate
+    padding = int(TRIM_PADDING_SECONDS * sample_rate)
+    start = max(int(speech_frames[0] * hop) - padding, 0)
+    end = min(int((speech_frames[-1] + 1) * hop) + padding, len(samples))
+    return samples[start:end], (len(samples) - (end - start)) / sample_rate
+
+
+def encode_opus(samples, sample_rate, output_rate=AUDIO_UPLOAD_SAMPLE_RATE, bitrate=AUDIO_UPLOAD_BITRATE):
+    '''
+    This function encodes mono float32 PCM to a low bitrate Ogg/Opus speech file in memory.
+    '''
+    command = [
+        ffmpeg_binary(), "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+        "-ar", str(output_rate),
+        "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+        "-f", "ogg", "pipe:1"
+    ]
+    process = subprocess.run(command, input=np.ascontiguousarray(samples).tobytes(), capture_output=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Could not encode audio: {process.stderr.decode(errors='replace').strip()}")
+    return process.stdout
+
+
+def prepare_upload_audio(audio):
+    '''
+    This function builds the version of an answer that is uploaded to Gemini:
+    mono, resampled, without leading/trailing silence, re-encoded as speech Opus.
+    Args:
+        audio (DecodedAudio): The answer, its shared PCM buffer is reused.
+    Returns:
+        tuple: The prepared DecodedAudio and a dict of what the preparation saved.
+    '''
+    started = time.perf_counter()
+    trimmed, trimmed_seconds = trim_silence(audio.samples, audio.sample_rate)
+    encoded = encode_opus(trimmed, audio.sample_rate)
+    prepared = DecodedAudio(
+        encoded,
+        mime_type="audio/ogg",
+        name="audio.ogg",
+        sample_rate=audio.sample_rate,
+        samples=trimmed
+    )
+    stats = {
+        "original_bytes": len(audio.data),
+        "prepared_bytes": len(encoded),
+        "bytes_saved": len(audio.data) - len(encoded),
+        "trimmed_seconds": round(trimmed_seconds, 2),
+        "prepare_seconds": round(time.perf_counter() - started, 3)
+    }
+    return prepared, stats
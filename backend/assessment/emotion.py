@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+
+# Output order of the DeepFace facial expression model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Input resolution of the facial expression model
+EMOTION_INPUT_SIZE = 48
+
+_emotion_model = None
+
+
+def load_emotion_model():
+    """
+    Build the DeepFace facial expression classifier once per process
+    """
+    global _emotion_model
+    if _emotion_model is None:
+        from deepface import DeepFace
+        try:
+            model = DeepFace.build_model(model_name='Emotion', task='facial_attribute')
+        except TypeError:
+            # DeepFace releases before the task argument
+            model = DeepFace.build_model('Emotion')
+        # Newer releases wrap the Keras model in a client object
+        _emotion_model = getattr(model, 'model', model)
+    return _emotion_model
+
+
+class EmotionEngine:
+    """
+    Batched facial emotion classification on face crops
+
+    Faces are cropped from the landmark bounding box the analyzer already has,
+    so no second face detector runs, and several crops are classified in a
+    single forward pass of the shared model.
+    """
+
+    def __init__(self, crop_padding=0.15):
+        """
+        Args:
+            crop_padding (float): Margin added around the landmark bounding box, relative to its size
+        """
+        self.crop_padding = crop_padding
+
+    def face_crop(self, frame, face_points):
+        """
+        Cut the face out of a BGR frame using an (N, 3) array of normalized face landmarks
+
+        Falls back to the whole frame when no face was tracked, like DeepFace
+        does with enforce_detection=False.
+        """
+        if face_points is None or not len(face_points):
+            return frame
+
+        height, width = frame.shape[:2]
+        x_min, y_min = face_points[:, :2].min(axis=0)
+        x_max, y_max = face_points[:, :2].max(axis=0)
+        pad_x = (x_max - x_min) * self.crop_padding
+        pad_y = (y_max - y_min) * self.crop_padding
+
+        left = max(int((x_min - pad_x) * width), 0)
+        right = min(int((x_max + pad_x) * width), width)
+        top = max(int((y_min - pad_y) * height), 0)
+        bottom = min(int((y_max + pad_y) * height), height)
+        if right <= left or bottom <= top:
+            return frame
+        return frame[top:bottom, left:right]
+
+    def preprocess(self, crop):
+        """
+        Convert a BGR crop into the model's 48x48 grayscale input in [0, 1]
+        """
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        gray = cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        return gray.astype(np.float32) / 255.0
+
+    def predict(self, crops):
+        """
+        Classify a list of BGR face crops in one forward pass
+
+        Returns:
+            list: (dominant_emotion, confidence) per crop, in input order
+        """
+        if not crops:
+            return []
+
+        batch = np.stack([self.preprocess(crop) for crop in crops])[..., np.newaxis]
+        predictions = load_emotion_model().predict(batch, verbose=0)
+
+        results = []
+        for prediction in predictions:
+            total = float(np.sum(prediction))
+            index = int(np.argmax(prediction))
+            confidence = float(prediction[index]) / total if total else 0.0
+            results.append((EMOTION_LABELS[index], confidence))
+        return results
@@ -0,0 +1,156 @@
+import cv2
+import queue
+import threading
+
+
+class FrameSource:
+    """
+    Decode sampled video frames on a background thread
+
+    Frames that are not sampled are skipped with grab(), which advances the
+    stream without the retrieve()/colour conversion cost. Sampled frames are
+    optionally downsized and handed to the consumer through a bounded queue,
+    so decoding overlaps with inference.
+    """
+
+    # Marks the end of the stream in the frame queue
+    _END = object()
+
+    def __init__(self, video_path, frame_stride=1, start_frame=0, end_frame=None,
+                 inference_width=None, queue_size=8, should_sample=None):
+        """
+        Args:
+            video_path (str): Path or URL of the video
+            frame_stride (int): Sample every Nth frame, counted by absolute frame index
+            start_frame (int): First frame index to read
+            end_frame (int): Frame index to stop before, None for the end of the video
+            inference_width (int): Downsize sampled frames wider than this, None to keep the original size
+            queue_size (int): Maximum number of decoded frames waiting for the consumer
+            should_sample (callable): Predicate on the frame index, replaces frame_stride when set.
+                May be assigned after open() once fps is known, before iterating.
+        """
+        self.video_path = video_path
+        self.frame_stride = frame_stride
+        self.should_sample = should_sample or self._stride_sample
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.inference_width = inference_width
+
+        self.total_frames = 0
+        self.fps = 0.0
+
+        self._cap = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def open(self):
+        """
+        Open the video and read its properties, decoding starts on iteration
+
+        Returns:
+            bool: False if the video could not be opened
+        """
+        self._cap = cv2.VideoCapture(self.video_path)
+        if not self._cap.isOpened():
+            self._cap.release()
+            return False
+
+        self.total_frames = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS)
+        return True
+
+    def close(self):
+        """
+        Stop the decode thread and release the video
+        """
+        self._stop.set()
+        if self._thread is not None:
+            # Unblock a producer waiting on a full queue
+            while self._thread.is_alive():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self._thread.join(timeout=0.05)
+            self._thread = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        """
+        Yield (frame_index, frame) for every sampled frame
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode_loop, name='frame-source', daemon=True)
+            self._thread.start()
+
+        while True:
+            item = self._queue.get()
+            if item is self._END:
+                break
+            yield item
+
+        if self._error is not None:
+            raise self._error
+
+    def _stride_sample(self, frame_index):
+        return frame_index % self.frame_stride == 0
+
+    def _seek(self):
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+        if int(self._cap.get(cv2.CAP_PROP_POS_FRAMES)) != self.start_frame:
+            # Seeking is not frame accurate for every container, step forward instead
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            for _ in range(self.start_frame):
+                if not self._cap.grab():
+                    break
+
+    def _resize(self, frame):
+        height, width = frame.shape[:2]
+        if not self.inference_width or width <= self.inference_width:
+            return frame
+        scale = self.inference_width / width
+        return cv2.resize(frame, (self.inference_width, round(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode_loop(self):
+        try:
+            if self.start_frame:
+                self._seek()
+
+            frame_index = self.start_frame
+            while not self._stop.is_set():
+                if self.end_frame is not None and frame_index >= self.end_frame:
+                    break
+                if not self._cap.grab():
+                    break
+
+                if self.should_sample(frame_index):
+                    ret, frame = self._cap.retrieve()
+                    if not ret:
+                        break
+                    if not self._put((frame_index, self._resize(frame))):
+                        return
+
+                frame_index += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(self._END)
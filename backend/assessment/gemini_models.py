@@ -0,0 +1,511 @@
+"""
+Shared Gemini models.
+
+Response schemas, generation configs and GenerativeModel objects are built once
+per process and reused by every request. Anything that varies per request (the
+question, a transcript, the feedbacks) goes into the message, never into the
+system instruction, so the model objects never have to be rebuilt.
+"""
+
+import google.generativeai as genai
+from google.ai.generativelanguage_v1beta.types import content
+
+MODEL_NAME = "gemini-1.5-flash"
+
+
+def json_generation_config(response_schema):
+  return {
+    "temperature": 1,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+    "response_schema": response_schema,
+    "response_mime_type": "application/json",
+  }
+
+
+def questions_schema():
+  return content.Schema(
+    type = content.Type.OBJECT,
+    enum = [],
+    required = ["questions"],
+    properties = {
+      "questions": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+    },
+  )
+
+
+def learning_plan_schema():
+  return content.Schema(
+    type = content.Type.OBJECT,
+    enum = [],
+    required = ["Goals", "Weekly Focus Areas", "Actionable Items", "Resources", "Progress Tracking Metrics", "Exercises and practice activities", "Tips to stay consistent"],
+    properties = {
+      "Goals": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+      "Weekly Focus Areas": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.OBJECT,
+          enum = [],
+          required = ["Week number", "Targets"],
+          properties = {
+            "Week number": content.Schema(
+              type = content.Type.ARRAY,
+              items = content.Schema(
+                type = content.Type.STRING,
+              ),
+            ),
+            "Targets": content.Schema(
+              type = content.Type.ARRAY,
+              items = content.Schema(
+                type = content.Type.STRING,
+              ),
+            ),
+          },
+        ),
+      ),
+      "Actionable Items": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+      "Resources": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+      "Progress Tracking Metrics": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+      "Exercises and practice activities": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+      "Tips to stay consistent": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.STRING,
+        ),
+      ),
+    },
+  )
+
+
+def candidate_assessment_schema(include_transcript=True):
+  return content.Schema(
+    type = content.Type.OBJECT,
+    enum = [],
+    required = ["general_feedback", "sentence_structuring_and_grammar", "speaking_rate", "pause_pattern", "filler_word_usage", "timestamped_feedback", "advanced_parameters"] + (["transcript"] if include_transcript else []),
+    properties = {
+      "general_feedback": content.Schema(
+        type = content.Type.STRING,
+      ),
+      "sentence_structuring_and_grammar": content.Schema(
+        type = content.Type.STRING,
+      ),
+      "speaking_rate": content.Schema(
+        type = content.Type.OBJECT,
+        enum = [],
+        required = ["rate", "comment"],
+        properties = {
+          "rate": content.Schema(
+            type = content.Type.NUMBER,
+          ),
+          "comment": content.Schema(
+            type = content.Type.STRING,
+          ),
+        },
+      ),
+      "pause_pattern": content.Schema(
+        type = content.Type.OBJECT,
+        enum = [],
+        required = ["count", "comment"],
+        properties = {
+          "count": content.Schema(
+            type = content.Type.INTEGER,
+          ),
+          "comment": content.Schema(
+            type = content.Type.STRING,
+          ),
+        },
+      ),
+      "filler_word_usage": content.Schema(
+        type = content.Type.OBJECT,
+        enum = [],
+        required = ["count", "comment"],
+        properties = {
+          "count": content.Schema(
+            type = content.Type.INTEGER,
+          ),
+          "comment": content.Schema(
+            type = content.Type.STRING,
+          ),
+        },
+      ),
+      "timestamped_feedback": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.OBJECT,
+          enum = [],
+          required = ["time", "feedback"],
+          properties = {
+            "time": content.Schema(
+              type = content.Type.STRING,
+            ),
+            "feedback": content.Schema(
+              type = content.Type.STRING,
+            ),
+          },
+        ),
+      ),
+      "advanced_parameters": content.Schema(
+        type = content.Type.OBJECT,
+        enum = [],
+        required = ["articulation", "enunciation", "tone", "intelligibility"],
+        properties = {
+          "articulation": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "enunciation": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "tone": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "intelligibility": content.Schema(
+            type = content.Type.STRING,
+          ),
+        },
+      ),
+      # Not generated when the transcript is produced locally
+      **({"transcript": content.Schema(
+        type = content.Type.STRING,
+      )} if include_transcript else {}),
+    },
+  )
+
+
+def transcript_refinement_schema():
+  return content.Schema(
+    type = content.Type.OBJECT,
+    enum = [],
+    required = ["similarity", "transcript"],
+    properties = {
+      "similarity": content.Schema(
+        type = content.Type.NUMBER,
+      ),
+      "transcript": content.Schema(
+        type = content.Type.STRING,
+      ),
+    },
+  )
+
+
+def final_summary_schema():
+  return content.Schema(
+    type = content.Type.OBJECT,
+    enum = [],
+    required = ["overall_feedback", "advanced"],
+    properties = {
+      "overall_feedback": content.Schema(
+        type = content.Type.OBJECT,
+        enum = [],
+        required = ["summary", "key_strengths", "areas_of_improvement"],
+        properties = {
+          "summary": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "key_strengths": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "areas_of_improvement": content.Schema(
+            type = content.Type.STRING,
+          ),
+        },
+      ),
+      "advanced": content.Schema(
+        type = content.Type.OBJECT,
+        enum = [],
+        required = ["articulation", "enunciation", "intelligibility", "tone", "filler_word_usage", "pause_pattern", "speaking_rate", "actionable_recommendations", "personalized_examples"],
+        properties = {
+          "articulation": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "enunciation": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "intelligibility": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "tone": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "filler_word_usage": content.Schema(
+            type = content.Type.OBJECT,
+            enum = [],
+            required = ["count", "comment"],
+            properties = {
+              "count": content.Schema(
+                type = content.Type.INTEGER,
+              ),
+              "comment": content.Schema(
+                type = content.Type.STRING,
+              ),
+            },
+          ),
+          "pause_pattern": content.Schema(
+            type = content.Type.OBJECT,
+            enum = [],
+            required = ["count", "comment"],
+            properties = {
+              "count": content.Schema(
+                type = content.Type.INTEGER,
+              ),
+              "comment": content.Schema(
+                type = content.Type.STRING,
+              ),
+            },
+          ),
+          "sentence_structuring_and_grammar": content.Schema(
+            type = content.Type.STRING,
+          ),
+          "speaking_rate": content.Schema(
+            type = content.Type.OBJECT,
+            enum = [],
+            required = ["rate", "comment"],
+            properties = {
+              "rate": content.Schema(
+                type = content.Type.INTEGER,
+              ),
+              "comment": content.Schema(
+                type = content.Type.STRING,
+              ),
+            },
+          ),
+          "actionable_recommendations": content.Schema(
+            type = content.Type.ARRAY,
+            items = content.Schema(
+              type = content.Type.OBJECT,
+              enum = [],
+              required = ["recommendation", "reason"],
+              properties = {
+                "recommendation": content.Schema(
+                  type = content.Type.STRING,
+                ),
+                "reason": content.Schema(
+                  type = content.Type.STRING,
+                ),
+              },
+            ),
+          ),
+          "personalized_examples": content.Schema(
+            type = content.Type.ARRAY,
+            items = content.Schema(
+              type = content.Type.OBJECT,
+              enum = [],
+              required = ["feedback", "line"],
+              properties = {
+                "feedback": content.Schema(
+                  type = content.Type.STRING,
+                ),
+                "line": content.Schema(
+                  type = content.Type.STRING,
+                ),
+              },
+            ),
+          ),
+        },
+      ),
+    },
+  )
+
+
+def graph_data_schema():
+  # Only the qualitative series, counts and rates are read from the stored feedbacks
+  return content.Schema(
+    type = content.Type.OBJECT,
+    enum = [],
+    required = ["tone", "clarity", "articulation", "enunciation", "sentence_structuring"],
+    properties = {
+      "tone": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.NUMBER,
+        ),
+      ),
+      "clarity": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.NUMBER,
+        ),
+      ),
+      "articulation": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.NUMBER,
+        ),
+      ),
+      "enunciation": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.NUMBER,
+        ),
+      ),
+      "sentence_structuring": content.Schema(
+        type = content.Type.ARRAY,
+        items = content.Schema(
+          type = content.Type.NUMBER,
+        ),
+      ),
+    },
+  )
+
+
+QUESTIONS_INSTRUCTION = """Role: You are a communication coach designing engaging and insightful questions to assess and enhance people's speaking abilities.
+
+Objective: Develop 5 thought-provoking questions for a casual yet professional conversation that assess communication skills while encouraging self-reflection and depth.  Focus on questions that reveal the candidate's ability to articulate clearly, think critically, and engage naturally.  Avoid hypothetical scenarios or overly complex situations.
+
+Guidelines for the Questions:
+* Focus on real experiences and personal reflections.
+* Encourage storytelling and detailed responses.
+* Assess clarity of thought, articulation, and engagement.
+* Maintain a balance between light and thought-provoking.
+
+Questions:
+1. Tell me about a recent accomplishment you're proud of.
+2. What's a topic you're passionate about and why?
+3. Describe a time you had to explain something complex to someone unfamiliar with the subject.
+4. What's a skill you're currently working on improving, and how are you approaching it?
+5.  Tell me about a time you received constructive feedback. How did you respond?
+
+
+Outcome of Responses
+Gain insights into the candidate's ability to organize thoughts, articulate clearly, and connect with an audience.
+Evaluate their communication style, critical thinking, and ability to reflect on personal experiences.
+"""
+
+LEARNING_PLAN_INSTRUCTION = "You are an expert communication coach and learning plan designer. Create a detailed, actionable learning plan in Markdown format based on the user's goals or feedback.\n\nYour plan should include:\n1. Clear, measurable goals broken down into milestones\n2. A structured weekly schedule (4-6 weeks)\n3. Specific exercises and practice activities\n4. Progress tracking metrics\n5. Recommended resources and tools\n6. Action items with deadlines\n7. Tips for maintaining motivation\n\nFormat the plan with proper Markdown headings, bullet points, and sections. Make it practical and achievable while challenging enough to drive real improvement.\n\nIf working with past feedback, analyze the patterns and areas needing most improvement to create a targeted plan.\n\nCurrent goals/feedback to address user prompt\n\n"
+
+CANDIDATE_ASSESSMENT_INSTRUCTION = """You are a senior communication assessment coach specializing in speech training. 
+    Your task is to evaluate a candidate's audio response to the question given with the audio. 
+    Provide a detailed assessment that includes the following:
+
+    1. **Transcript**: {transcript_task}
+    2. **General Feedback**: Overall impressions of the response.
+    3. **Sentence Structuring and Grammar**: Assessment of sentence flow and grammatical accuracy.
+    4. **Speaking Rate**: Rate of speech, rated on a scale from 1 (very slow) to 5 (very fast).
+    5. **Number of Pauses**: Count of noticeable pauses during the response.
+    6. **Pause Patterns**: Analysis of pause placement and its impact on delivery.
+    7. **Filler Word Usage**: Count and examples of filler words (e.g., "like," "um," "uh").
+    8. **Overall Confidence**: Evaluation of how confident the candidate appears.
+    9. **Advanced Parameters**: Detailed analysis of tone, enunciation, articulation, and intelligibility.
+
+    Additionally, provide **timestamped feedback** (e.g., "HH:MM:SS") for specific moments in the response that require improvement.
+    This personalized feedback will help the candidate identify and address key aspects of their communication skills.
+
+    Ensure clarity and precision in the evaluation to make the assessment as actionable as possible."""
+
+TRANSCRIPT_REFINEMENT_INSTRUCTION = "\nYou are a senior English communication and speech analysis expert. Given two transcripts of the same audio file, your task is to:\n\nAssess Similarity: Compare the two transcripts to determine their similarity. If they differ, evaluate the degree of difference.\nCombine Transcripts: Create a final version by merging the transcripts into the most natural and cohesive version. Ensure this final transcript retains all original mistakes and speech errors from both the transcripts.\nYour output should include:\n\nSimilarity Score: A numerical score representing the similarity between the two transcripts.\nFinal Transcript: The merged transcript that preserves every speech error, filler word, and grammatical mistake from the both transcripts.\nProvide an accurate and detailed output, ensuring the integrity of the speaker's original speech is maintained."
+
+FINAL_SUMMARY_INSTRUCTION = "You are an advanced communication analysis and report generation expert. Your task is to summarize the results of a 5-question communication skills quiz, where each question includes detailed feedback in the following format:  \n\n### Input Format (Example Feedback):  \n```json\n{\n  \"advanced_parameters\": {\n    \"articulation\": \"Articulation is clear, but could be improved for a more polished delivery.\",\n    \"enunciation\": \"Enunciation is understandable but lacks precision at times.\",\n    \"intelligibility\": \"The response is mostly intelligible, though some words are mumbled.\",\n    \"tone\": \"The tone is somewhat hesitant and lacks confidence.\"\n  },\n  \"filler_word_usage\": {\n    \"comment\": \"The response includes a noticeable pause and lack of a clear direction in the middle of the introduction, indicating a lack of preparation and potentially nervousness.\",\n    \"count\": 1\n  },\n  \"general_feedback\": \"The candidate's self-introduction is brief and lacks detail. It is unclear why the candidate wants to change careers. The introduction needs significant improvement to be effective.\",\n  \"pause_pattern\": {\n    \"comment\": \"The significant pause in the middle of the response disrupts the flow and suggests a lack of preparation or confidence. Pauses should be used strategically.\",\n    \"count\": 2\n  },\n  \"sentence_structuring_and_grammar\": \"Sentence structure is simple but grammatically correct. The response would benefit from more structured and comprehensive sentences.\",\n  \"speaking_rate\": {\n    \"comment\": \"The speaking rate is slow in places, adding to the perception of hesitancy.\",\n    \"rate\": 2\n  },\n  \"timestamped_feedback\": [\n    {\n      \"feedback\": \"Improve the flow here by eliminating the long pause and elaborating on your career change aspirations.\",\n      \"time\": \"00:00:08\"\n    },\n    {\n      \"feedback\": \"Add more detail about your experience and skills. Quantify your achievements whenever possible.\",\n      \"time\": \"00:00:15\"\n    }\n  ],\n  \"transcript\": \"Hello, I am Sunhit Goswami. I am a marketing manager at Salesforce. I want to uh change my career now. I enjoy marketing. Thank you.\"\n}\n```  \n\n### Task Requirements:  \nAnalyze and combine the feedback from all 5 responses into a **comprehensive final assessment** that includes the following sections:  \n\n1. **Overall Feedback**: Summarize the key strengths and areas for improvement across all responses.  \n2. **Rubric-Specific Insights**:  \n   - Articulation, Enunciation, Intelligibility, and Tone  \n   - Filler Word Usage and Pauses  \n   - Sentence Structuring and Grammar  \n   - Speaking Rate  \n3. **Actionable Recommendations**: Provide targeted advice on how to improve the candidate's communication skills based on recurring patterns in the feedback.  \n4. **Personalized Examples**: Highlight 2–3 specific timestamped examples where the candidate can make significant improvements.  \n5. **Final Transcript Commentary**: Include observations on how the candidate's responses align or diverge from the intended communication goals.  \n\n### Additional Output:\nStructure the output to be ready for generating a PDF report, ensuring clear sections and formatting for professional presentation.  \n\nMake the summary detailed, actionable, and tailored to help the candidate improve effectively.\n\nHere is an example of the summary:\n{\n  \"overall_feedback\": {\n    \"summary\": \"The candidate demonstrates a basic understanding of communication but requires significant improvement in delivery and structure.\",\n    \"key_strengths\": [\"Clear articulation\", \"Basic grammar usage\"],\n    \"areas_for_improvement\": [\"Confidence in tone\", \"Detailed and structured responses\", \"Reduced filler word usage\"]\n  },\n  \"rubric_specific_insights\": {\n    \"articulation\": \"Mostly clear but lacks polish.\",\n    \"enunciation\": \"Understandable but needs greater precision.\",\n    \"intelligibility\": \"Generally intelligible, with occasional mumbling.\",\n    \"tone\": \"Hesitant and lacks confidence.\",\n    \"filler_word_usage\": {\n      \"count\": 5,\n      \"comment\": \"Frequent use of 'um' and 'uh,' suggesting nervousness.\"\n    },\n    \"pause_pattern\": {\n      \"count\": 3,\n      \"comment\": \"Pauses disrupt flow and appear unintentional.\"\n    },\n    \"sentence_structuring_and_grammar\": \"Basic sentence structure with room for more complex constructions.\",\n    \"speaking_rate\": {\n      \"rate\": 2,\n      \"comment\": \"Slow speaking rate creates an impression of hesitancy.\"\n    }\n  },\n  \"actionable_recommendations\": [\n    {\n      \"recommendation\": \"Practice delivering responses with more confidence.\",\n      \"reason\": \"A confident tone will enhance audience engagement.\"\n    },\n    {\n      \"recommendation\": \"Reduce filler words through practice.\",\n      \"reason\": \"Eliminating filler words will create a more professional impression.\"\n    }\n  ],\n  \"personalized_examples\": [\n    {\n      \"feedback\": \"Clarify your career change aspirations.\",\n      \"line\": \"So I now uh want to change into marketing\"\n    },\n    {\n      \"feedback\": \"Add more detail about your skills and achievements.\",\n      \"line\": \"I won a competition in India\"\n    }\n  ],\n  \"final_transcript_commentary\": \"The transcript reflects a hesitant speaker with basic structure and clarity but requires better detail and fluency.\"\n}\n"
+
+GRAPH_DATA_INSTRUCTION = """You are an advanced AI system tasked with extracting **graphable data** from the qualitative feedback given for each question of a communication assessment.
+
+### **Input Details**:
+For each question, in order: the general feedback, the sentence structuring and grammar feedback, and the advanced parameters (articulation, enunciation, intelligibility, tone).
+
+### **Output Requirements**:
+Provide one array per parameter with one score per question, in question order, on a 1-5 scale:
+- **tone**: Confidence of the tone.
+- **clarity**: Clarity and intelligibility.
+- **articulation**: Articulation quality.
+- **enunciation**: Enunciation quality.
+- **sentence_structuring**: Sentence structuring and grammar quality.
+
+Example for 5 questions:
+```json
+{
+  "tone": [3.2, 3.5, 3.0, 4.0, 3.8],
+  "clarity": [4.0, 3.8, 4.2, 3.9, 4.1],
+  "articulation": [4.5, 4.2, 4.0, 3.8, 4.1],
+  "enunciation": [4.0, 3.9, 3.8, 4.1, 4.0],
+  "sentence_structuring": [3.5, 3.8, 4.0, 3.7, 4.2]
+}
+```
+
+Convert the qualitative insights into this consistent numerical scale so the values can be plotted directly. Counts such as pauses and filler words are measured elsewhere and must not be included."""
+
+
+# Model name -> (response schema factory, system instruction)
+MODEL_SPECS = {
+  "questions": (questions_schema, QUESTIONS_INSTRUCTION),
+  "learning_plan": (learning_plan_schema, LEARNING_PLAN_INSTRUCTION),
+  "candidate_assessment": (
+    lambda: candidate_assessment_schema(include_transcript=True),
+    CANDIDATE_ASSESSMENT_INSTRUCTION.format(
+      transcript_task="A written transcript of the candidate's audio response."
+    )
+  ),
+  # Used when the transcript was produced locally and is passed in the message
+  "candidate_assessment_with_transcript": (
+    lambda: candidate_assessment_schema(include_transcript=False),
+    CANDIDATE_ASSESSMENT_INSTRUCTION.format(
+      transcript_task="Already transcribed, do not transcribe again. Use the transcript given with the audio to support your assessment."
+    )
+  ),
+  "transcript_refinement": (transcript_refinement_schema, TRANSCRIPT_REFINEMENT_INSTRUCTION),
+  "final_summary": (final_summary_schema, FINAL_SUMMARY_INSTRUCTION),
+  "graph_data": (graph_data_schema, GRAPH_DATA_INSTRUCTION),
+}
+
+
+def build_model(name):
+  """Builds a new GenerativeModel for a MODEL_SPECS entry, including its schema tree."""
+  schema_factory, system_instruction = MODEL_SPECS[name]
+  return genai.GenerativeModel(
+    model_name=MODEL_NAME,
+    generation_config=json_generation_config(schema_factory()),
+    system_instruction=system_instruction,
+  )
+
+
+class GeminiModelRegistry:
+  """Builds every model once per process and hands out the shared instance.
+
+  GenerativeModel objects only hold configuration, each request still opens its
+  own chat session, so sharing them between concurrent requests is safe.
+  """
+
+  def __init__(self, specs):
+    self.specs = specs
+    self._models = {}
+
+  def get(self, name):
+    model = self._models.get(name)
+    if model is None:
+      model = self._models[name] = build_model(name)
+    return model
+
+  def build_all(self):
+    for name in self.specs:
+      self.get(name)
+
+
+gemini_models = GeminiModelRegistry(MODEL_SPECS)
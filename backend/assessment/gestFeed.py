@@ -1,7 +1,40 @@
-from assessment.gesture import AIInterviewerAnalyzer
+from assessment.quality_tiers import DEFAULT_QUALITY_TIER
+import os
+import time
+
+# Bump when the analysis changes in a way that invalidates cached reports
+ANALYZER_VERSION = "1"
+GESTURE_CONFIG_PATH = "config.json"
+
+def get_gesture_cache_parts(quality_tier: str = DEFAULT_QUALITY_TIER):
+    # Everything besides the video that determines the gesture report
+    config_text = ""
+    if os.path.exists(GESTURE_CONFIG_PATH):
+        with open(GESTURE_CONFIG_PATH, 'r') as f:
+            config_text = f.read()
+    return [ANALYZER_VERSION, config_text, quality_tier]
+
+def get_gesture_feedback(videoURL: str, quality_tier: str = DEFAULT_QUALITY_TIER):
+    # Mediapipe and OpenCV are imported by the job worker, never by the API process
+    from assessment.gesture import AIInterviewerAnalyzer
 
-def get_gesture_feedback(videoURL: str):
     # Get gesture analysis
-    analyzer = AIInterviewerAnalyzer()
+    analyzer = AIInterviewerAnalyzer(GESTURE_CONFIG_PATH, quality_tier=quality_tier)
     gesture_feedback = analyzer.run_interview_analysis(videoURL)
+    if gesture_feedback is None:
+        raise RuntimeError(f"Could not open video: {videoURL}")
     return gesture_feedback
+
+def warm_up_gesture_models():
+    # Import the gesture stack, build the Mediapipe graphs once and load the
+    # emotion model so the first job does not pay for it. Returns the load time
+    started = time.perf_counter()
+    from assessment.gesture import AIInterviewerAnalyzer
+    from assessment.emotion import load_emotion_model
+
+    analyzer = AIInterviewerAnalyzer(GESTURE_CONFIG_PATH, quality_tier=DEFAULT_QUALITY_TIER)
+    analyzer.start_session()
+    analyzer.close_session()
+    if analyzer.emotion_engine is not None and analyzer.config['emotion_enabled']:
+        load_emotion_model()
+    return time.perf_counter() - started
@@ -1,15 +1,82 @@
 import cv2
 import mediapipe as mp
-from deepface import DeepFace
 import numpy as np
 import logging
 from datetime import datetime
+import argparse
 import json
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from assessment.frame_source import FrameSource
+from assessment.sampling import SamplingScheduler
+from assessment.emotion import EmotionEngine
+from assessment.results import AnalysisResults
+from assessment.quality_tiers import QUALITY_TIERS
+from assessment.timing import make_stage_timer
+
+# Pose landmark indices (mp.solutions.pose.PoseLandmark)
+POSE_NOSE = 0
+POSE_SHOULDERS = np.array([11, 12])
+POSE_HIPS = np.array([23, 24])
+POSE_MOTION_POINTS = np.array([0, 11, 12, 23, 24])
+
+# Face mesh eye landmark indices, ordered [left eye, right eye]
+EYE_TOP = np.array([159, 386])
+EYE_BOTTOM = np.array([145, 374])
+EYE_LEFT_CORNER = np.array([33, 263])
+EYE_RIGHT_CORNER = np.array([133, 362])
+EYE_CENTER_POINTS = np.array([33, 133, 157, 158, 173, 263, 362, 380, 381, 382, 463])
+
+
+def landmarks_to_array(landmarks):
+    """
+    Convert a Mediapipe landmark list into an (N, 3) array of normalized x, y, z
+    """
+    if landmarks is None:
+        return None
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks.landmark], dtype=np.float32)
+
+
+def eye_metrics(face_points):
+    """
+    Eye openness and eye centre for one (N, 3) or many (F, N, 3) face landmark arrays
+
+    Returns:
+        tuple: (openness of shape (..., 2) ordered [left, right], eye centre of shape (..., 2))
+    """
+    vertical = np.abs(face_points[..., EYE_TOP, 1] - face_points[..., EYE_BOTTOM, 1])
+    horizontal = np.abs(face_points[..., EYE_LEFT_CORNER, 0] - face_points[..., EYE_RIGHT_CORNER, 0])
+    ratio = np.divide(vertical, horizontal, out=np.ones_like(vertical), where=horizontal > 0)
+    openness = 1 - np.minimum(ratio, 1)
+    eye_center = face_points[..., EYE_CENTER_POINTS, :2].mean(axis=-2)
+    return openness, eye_center
+
+
+def posture_metrics(pose_points):
+    """
+    Shoulder alignment, hip alignment and head tilt for one (N, 3) or many (F, N, 3) pose arrays
+    """
+    shoulders = pose_points[..., POSE_SHOULDERS, :]
+    hips = pose_points[..., POSE_HIPS, :]
+    shoulder_diff = np.abs(shoulders[..., 0, 1] - shoulders[..., 1, 1])
+    hip_diff = np.abs(hips[..., 0, 1] - hips[..., 1, 1])
+    head_tilt = np.abs(shoulders[..., 0, 0] - shoulders[..., 1, 0])
+    return shoulder_diff, hip_diff, head_tilt
+
 
 class AIInterviewerAnalyzer:
-    def __init__(self, config_path='config.json'):
+    def __init__(self, config_path='config.json', config=None, quality_tier=None, metrics_sink=None):
         """
         Initialize the AI Interviewer Analyzer with configurable parameters
+
+        Args:
+            config_path (str): JSON file to load the configuration from
+            config (dict): Already loaded configuration, takes precedence over config_path
+            quality_tier (str): Name of a QUALITY_TIERS entry applied over the configuration
+            metrics_sink (callable): Receives the stage timing summary when profile_stages is on
         """
         # Logging setup
         logging.basicConfig(
@@ -20,7 +87,12 @@ class AIInterviewerAnalyzer:
         self.logger = logging.getLogger(__name__)
 
         # Configuration
-        self.load_config(config_path)
+        if config is not None:
+            self.config = dict(config)
+        else:
+            self.load_config(config_path)
+        if quality_tier is not None:
+            self.apply_quality_tier(quality_tier)
 
         # Mediapipe initialization
         self.mp_pose = mp.solutions.pose
@@ -28,58 +100,183 @@ class AIInterviewerAnalyzer:
         self.mp_holistic = mp.solutions.holistic
         self.mp_drawing = mp.solutions.drawing_utils
 
-        # Analysis queues and flags
-        self.analysis_results = {
-            'posture_details': [],
-            'emotion_history': [],
-            'eye_contact_history': [],
-            'total_scores': []
-        }
+        # Analysis results and flags
+        self.analysis_results = AnalysisResults(
+            store_series=self.config['store_series'],
+            store_frame_details=self.config['store_frame_details']
+        )
         self.running = False
+        self.sampling_stats = {}
+        # Mediapipe solutions kept open for the duration of a session
+        self._session = None
+        # State for the adaptive sampling motion signal
+        self._last_pose_points = None
+        self._prev_pose_points = None
+        self._prev_thumbnail = None
+        # Last emotion result, held between emotion samples
+        self._last_emotion = None
+        self._emotion_bucket = None
+        self.emotion_samples = 0
+        # Face crops waiting for a batched emotion pass, with the history positions they fill
+        self._pending_emotions = []
+        self.emotion_engine = EmotionEngine() if self.config['emotion_backend'] == 'engine' else None
+        # Per-stage wall time, a no-op timer unless profile_stages is on
+        self.stage_timer = make_stage_timer(self.config['profile_stages'], metrics_sink)
 
     def load_config(self, config_path):
         """
         Load configuration from JSON file
         """
+        default_config = {
+            'min_detection_confidence': 0.5,
+            'min_tracking_confidence': 0.5,
+            # Keep Mediapipe solutions open across frames instead of rebuilding them per frame
+            'persistent_session': True,
+            # 'holistic' extracts pose and face landmarks in one pass, 'pose_face_mesh' runs the two dedicated models
+            'landmark_model': 'holistic',
+            # Mediapipe pose model size (0 lite, 1 full, 2 heavy) and iris refinement of the face mesh
+            'model_complexity': 1,
+            'refine_face_landmarks': False,
+            # Set by apply_quality_tier and recorded in the report
+            'quality_tier': None,
+            # Render annotated frames in a preview window; leave off on headless servers
+            'debug_display': False,
+            # 'stride' analyzes every frame_stride-th frame, 'rate' targets sample_rate analyses
+            # per second of video, 'adaptive' moves between min/max rate with the amount of motion
+            'sampling_mode': 'stride',
+            'frame_stride': 5,
+            'sample_rate': 6.0,
+            'min_sample_rate': 2.0,
+            'max_sample_rate': 12.0,
+            'motion_threshold': 0.02,
+            # Emotion analyses per second of video; landmarks run at the sampling rate and the
+            # last emotion is held in between. None runs emotion on every analyzed frame
+            'emotion_rate': 1.0,
+            # Skip the emotion model entirely, emotion scores stay 0
+            'emotion_enabled': True,
+            # 'engine' classifies landmark face crops in batches with a shared model,
+            # 'deepface' calls DeepFace.analyze on the full frame
+            'emotion_backend': 'engine',
+            'emotion_batch_size': 8,
+            # Keep compact per-frame score series in the report; the full per-frame
+            # posture_details dicts are only kept (and reported) when store_frame_details is on
+            'store_series': True,
+            'store_frame_details': False,
+            # Number of worker processes used to analyze a video in parallel segments
+            'num_workers': 1,
+            # Downsize sampled frames wider than this before inference (None keeps the source size)
+            'inference_width': None,
+            # Decoded frames buffered ahead of inference by the frame source thread
+            'prefetch_frames': 8,
+            # Record per-stage wall time percentiles in the report under 'timing'
+            'profile_stages': False,
+            'emotion_weights': {
+                'happy': 5,
+                'neutral': 3,
+                'sad': -5,
+                'angry': -5
+            },
+            'posture_thresholds': {
+                'shoulder_diff_excellent': 0.05,
+                'shoulder_diff_good': 0.1,
+                'hip_diff_excellent': 0.05,
+                'hip_diff_good': 0.1,
+                'head_tilt_threshold': 0.1
+            }
+        }
+
         try:
             with open(config_path, 'r') as f:
-                self.config = json.load(f)
+                self.config = {**default_config, **json.load(f)}
         except FileNotFoundError:
             self.logger.warning(f"Config file {config_path} not found. Using default settings.")
-            self.config = {
-                'min_detection_confidence': 0.5,
-                'min_tracking_confidence': 0.5,
-                'emotion_weights': {
-                    'happy': 5,
-                    'neutral': 3,
-                    'sad': -5,
-                    'angry': -5
-                },
-                'posture_thresholds': {
-                    'shoulder_diff_excellent': 0.05,
-                    'shoulder_diff_good': 0.1,
-                    'hip_diff_excellent': 0.05,
-                    'hip_diff_good': 0.1,
-                    'head_tilt_threshold': 0.1
-                }
+            self.config = default_config
+
+    def apply_quality_tier(self, quality_tier):
+        """
+        Override the configuration with the settings of a named quality tier
+        """
+        if quality_tier not in QUALITY_TIERS:
+            raise ValueError(f"Unknown quality tier: {quality_tier}")
+        self.config.update(QUALITY_TIERS[quality_tier])
+        self.config['quality_tier'] = quality_tier
+
+    def start_session(self):
+        """
+        Build the Mediapipe solutions once and keep them open in tracking mode
+        """
+        if self._session is None:
+            self._session = self._create_solutions()
+        return self._session
+
+    def close_session(self):
+        """
+        Release the Mediapipe solutions held by the current session
+        """
+        if self._session is not None:
+            for solution in self._session.values():
+                solution.close()
+            self._session = None
+
+    def _create_solutions(self):
+        """
+        Instantiate the Mediapipe solutions required by the configured landmark model
+        """
+        options = {
+            'min_detection_confidence': self.config['min_detection_confidence'],
+            'min_tracking_confidence': self.config['min_tracking_confidence']
+        }
+        model_complexity = self.config['model_complexity']
+        refine_face_landmarks = self.config['refine_face_landmarks']
+        landmark_model = self.config['landmark_model']
+        if landmark_model == 'holistic':
+            return {'holistic': self.mp_holistic.Holistic(
+                model_complexity=model_complexity,
+                refine_face_landmarks=refine_face_landmarks,
+                **options
+            )}
+        if landmark_model == 'pose_face_mesh':
+            return {
+                'pose': self.mp_pose.Pose(model_complexity=model_complexity, **options),
+                'face_mesh': self.mp_face_mesh.FaceMesh(refine_landmarks=refine_face_landmarks, **options)
             }
+        raise ValueError(f"Unknown landmark model: {landmark_model}")
+
+    def extract_landmarks(self, image):
+        """
+        Run the configured landmark model once on an RGB image
+
+        Returns:
+            tuple: (pose_landmarks, face_landmarks), either of which may be None
+        """
+        solutions = self._session or self._create_solutions()
+        try:
+            if 'holistic' in solutions:
+                results = solutions['holistic'].process(image)
+                return results.pose_landmarks, results.face_landmarks
+
+            results_pose = solutions['pose'].process(image)
+            results_face_mesh = solutions['face_mesh'].process(image)
+            face_landmarks = None
+            if results_face_mesh.multi_face_landmarks:
+                face_landmarks = results_face_mesh.multi_face_landmarks[0]
+            return results_pose.pose_landmarks, face_landmarks
+        finally:
+            if solutions is not self._session:
+                for solution in solutions.values():
+                    solution.close()
 
     def analyze_eye_contact(self, face_landmarks):
         """
         Analyze eye contact and gaze direction
         """
-        if not face_landmarks:
+        face_points = landmarks_to_array(face_landmarks)
+        if face_points is None or not len(face_points):
             return 0, "No eye tracking"
 
-        # Key eye landmarks from MediaPipe Face Mesh
-        left_eye_center = np.mean([
-            [lm.x, lm.y] for i, lm in enumerate(face_landmarks.landmark) 
-            if i in [33, 133, 157, 158, 173, 263, 362, 380, 381, 382, 463]
-        ], axis=0)
-
-        # Calculate eye openness and direction
-        left_eye_openness = self._calculate_eye_openness(face_landmarks, is_right=False)
-        right_eye_openness = self._calculate_eye_openness(face_landmarks, is_right=True)
+        # Eye openness for both eyes in one vectorized pass
+        openness, _ = eye_metrics(face_points)
+        left_eye_openness, right_eye_openness = float(openness[0]), float(openness[1])
 
         # Eye contact scoring
         eye_contact_score = 0
@@ -94,56 +291,25 @@ class AIInterviewerAnalyzer:
 
         return eye_contact_score, eye_contact_status
 
-    def _calculate_eye_openness(self, landmarks, is_right=False):
+    def score_eye_contact_batch(self, face_points):
         """
-        Calculate eye openness ratio
+        Eye contact scores for a stack of face landmark arrays of shape (F, N, 3)
         """
-        if is_right:
-            # Right eye landmarks
-            eye_indices = {
-                'top': 386, 'bottom': 374, 
-                'left': 263, 'right': 362
-            }
-        else:
-            # Left eye landmarks
-            eye_indices = {
-                'top': 159, 'bottom': 145, 
-                'left': 33, 'right': 133
-            }
-
-        # Calculate vertical and horizontal eye distances
-        vertical_dist = abs(landmarks.landmark[eye_indices['top']].y - 
-                            landmarks.landmark[eye_indices['bottom']].y)
-        horizontal_dist = abs(landmarks.landmark[eye_indices['left']].x - 
-                              landmarks.landmark[eye_indices['right']].x)
-
-        # Eye openness ratio
-        return 1 - min(vertical_dist / horizontal_dist, 1)
+        openness, _ = eye_metrics(np.asarray(face_points))
+        engaged = np.all(openness > 0.8, axis=-1)
+        disengaged = np.any(openness < 0.5, axis=-1)
+        return np.where(engaged, 3, np.where(disengaged, -3, 0))
 
     def analyze_posture(self, pose_landmarks):
         """
         Advanced posture analysis with multiple factors
         """
-        if not pose_landmarks:
+        pose_points = landmarks_to_array(pose_landmarks)
+        if pose_points is None or not len(pose_points):
             return 0, "No landmarks", {}
 
-        # Extract key body points
-        shoulders = [
-            pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_SHOULDER],
-            pose_landmarks.landmark[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        ]
-        hips = [
-            pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_HIP],
-            pose_landmarks.landmark[self.mp_pose.PoseLandmark.RIGHT_HIP]
-        ]
-        head = pose_landmarks.landmark[self.mp_pose.PoseLandmark.NOSE]
-
-        # Calculate differences
-        shoulder_diff = abs(shoulders[0].y - shoulders[1].y)
-        hip_diff = abs(hips[0].y - hips[1].y)
-
-        # Head tilt detection
-        head_tilt = abs(shoulders[0].x - shoulders[1].x)
+        # Alignment differences and head tilt from the key body points
+        shoulder_diff, hip_diff, head_tilt = (float(value) for value in posture_metrics(pose_points))
 
         # More complex posture scoring
         posture_details = {
@@ -197,178 +363,311 @@ class AIInterviewerAnalyzer:
             'deduction_reasons': deduction_reasons
         }
 
-    def process_frame(self, frame):
+    def score_posture_batch(self, pose_points):
+        """
+        Posture scores for a stack of pose landmark arrays of shape (F, N, 3)
+        """
+        thresholds = self.config['posture_thresholds']
+        shoulder_diff, hip_diff, head_tilt = posture_metrics(np.asarray(pose_points))
+
+        shoulder_score = np.where(shoulder_diff < thresholds['shoulder_diff_excellent'], 5,
+                                  np.where(shoulder_diff < thresholds['shoulder_diff_good'], 3, -3))
+        hip_score = np.where(hip_diff < thresholds['hip_diff_excellent'], 5,
+                             np.where(hip_diff < thresholds['hip_diff_good'], 3, -3))
+        tilt_penalty = np.where(head_tilt > thresholds['head_tilt_threshold'], -3, 0)
+        return shoulder_score + hip_score + tilt_penalty
+
+    def process_frame(self, frame, timestamp=None):
         """
         Process a single frame with comprehensive analysis
+
+        Args:
+            frame: BGR frame
+            timestamp (float): Position of the frame in the video in seconds, used to
+                schedule the emotion analyzer. None analyzes emotion on every frame
         """
+        timer = self.stage_timer
+        started = timer.start()
+
         # Convert image to RGB
         image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         image.flags.writeable = False
 
-        # Process image using Mediapipe
-        with self.mp_pose.Pose(
-            min_detection_confidence=self.config['min_detection_confidence'], 
-            min_tracking_confidence=self.config['min_tracking_confidence']
-        ) as pose:
-            with self.mp_face_mesh.FaceMesh(
-                min_detection_confidence=self.config['min_detection_confidence'], 
-                min_tracking_confidence=self.config['min_tracking_confidence']
-            ) as face_mesh:
-                with self.mp_holistic.Holistic(
-                    min_detection_confidence=self.config['min_detection_confidence'], 
-                    min_tracking_confidence=self.config['min_tracking_confidence']
-                ) as holistic:
-                
-                    results_pose = pose.process(image)
-                    results_face_mesh = face_mesh.process(image)
-                    results_holistic = holistic.process(image)
-                    
-                    image.flags.writeable = True
-                    image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-                    # Comprehensive analysis
-                    posture_score, posture_status, posture_details = self.analyze_posture(results_pose.pose_landmarks)
-                    
-                    # Emotion analysis
-                    try:
-                        emotion_analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False, silent=True)
-                        emotion = emotion_analysis[0]['dominant_emotion']
-                        emotion_confidence = max(emotion_analysis[0]['emotion'].values()) / sum(emotion_analysis[0]['emotion'].values())
-                        emotion_score = self.config['emotion_weights'].get(emotion, 0)
-                    except Exception as e:
-                        emotion = "unknown"
-                        emotion_score = 0
-                        emotion_confidence = 0
-                        self.logger.error(f"Emotion analysis failed: {str(e)}")
-
-                    # Eye contact analysis
-                    eye_contact_score = 0
-                    eye_contact_status = "No tracking"
-                    if results_face_mesh.multi_face_landmarks:
-                        eye_contact_score, eye_contact_status = self.analyze_eye_contact(results_face_mesh.multi_face_landmarks[0])
-
-                    # Total score calculation
-                    total_score = posture_score + emotion_score + eye_contact_score
-
-                    # Update analysis history
-                    self.analysis_results['posture_details'].append(posture_details)
-                    self.analysis_results['emotion_history'].append(emotion_score)
-                    self.analysis_results['eye_contact_history'].append(eye_contact_score)
-                    self.analysis_results['total_scores'].append(total_score)
-
-                    # Annotate frame
-                    cv2.putText(image, f"Posture: {posture_status}", (10, 50), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    cv2.putText(image, f"Emotion: {emotion} ({emotion_confidence:.2f})", (10, 100), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-                    cv2.putText(image, f"Eye Contact: {eye_contact_status}", (10, 150), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                    cv2.putText(image, f"Total Score: {total_score}", (10, 200), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-                    return image, total_score, posture_details
+        # Extract pose and face landmarks with a single model pass, converted once to arrays
+        pose_landmarks, face_landmarks = self.extract_landmarks(image)
+        pose_points = landmarks_to_array(pose_landmarks)
+        face_points = landmarks_to_array(face_landmarks)
+        self._last_pose_points = pose_points
+        started = timer.record('landmarks', started)
+
+        # Comprehensive analysis
+        posture_score, posture_status, posture_details = self.analyze_posture(pose_points)
+        started = timer.record('posture', started)
+
+        # Emotion analysis, held between samples when it runs slower than the landmarks.
+        # With the batched engine the score of this frame is filled in when the batch is flushed
+        position = self.analysis_results.count
+        if not self.config['emotion_enabled']:
+            self._last_emotion = ("disabled", 0, 0)
+        elif self._emotion_due(timestamp):
+            self.emotion_samples += 1
+            timer.increment('emotion_samples')
+            if self.emotion_engine is not None:
+                self._pending_emotions.append((self.emotion_engine.face_crop(frame, face_points), [position]))
+            else:
+                self._last_emotion = self.analyze_emotion(frame)
+        elif self._pending_emotions:
+            self._pending_emotions[-1][1].append(position)
+
+        if self._pending_emotions:
+            emotion, emotion_confidence, emotion_score = "pending", 0, 0
+        else:
+            emotion, emotion_confidence, emotion_score = self._last_emotion
+        started = timer.record('emotion', started)
+
+        # Eye contact analysis
+        eye_contact_score = 0
+        eye_contact_status = "No tracking"
+        if face_points is not None:
+            eye_contact_score, eye_contact_status = self.analyze_eye_contact(face_points)
+        started = timer.record('eye_contact', started)
+
+        # Total score calculation
+        total_score = posture_score + emotion_score + eye_contact_score
+
+        # Update analysis history
+        self.analysis_results.append(posture_details, posture_score, emotion_score, eye_contact_score)
+        timer.increment('frames')
+
+        if len(self._pending_emotions) >= self.config['emotion_batch_size']:
+            self.flush_emotions()
+            started = timer.start()
+
+        # Annotate frame only in debug mode; headless runs skip drawing entirely
+        annotated_frame = None
+        if self.config['debug_display']:
+            annotated_frame = self.annotate_frame(frame, posture_status, emotion, emotion_confidence,
+                                                  eye_contact_status, total_score)
+            timer.record('annotate', started)
+
+        return annotated_frame, total_score, posture_details
+
+    def annotate_frame(self, frame, posture_status, emotion, emotion_confidence, eye_contact_status, total_score):
+        """
+        Draw the per-frame analysis overlay on a copy of the BGR frame
+        """
+        image = frame.copy()
+        cv2.putText(image, f"Posture: {posture_status}", (10, 50), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        cv2.putText(image, f"Emotion: {emotion} ({emotion_confidence:.2f})", (10, 100), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+        cv2.putText(image, f"Eye Contact: {eye_contact_status}", (10, 150), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        cv2.putText(image, f"Total Score: {total_score}", (10, 200), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        return image
+
+    def analyze_emotion(self, frame):
+        """
+        Classify the dominant facial emotion of a BGR frame
+
+        Returns:
+            tuple: (emotion, confidence, score weighted by emotion_weights)
+        """
+        # Only the 'deepface' emotion backend needs the full DeepFace stack
+        from deepface import DeepFace
+
+        try:
+            emotion_analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False, silent=True)
+            emotion = emotion_analysis[0]['dominant_emotion']
+            emotion_confidence = max(emotion_analysis[0]['emotion'].values()) / sum(emotion_analysis[0]['emotion'].values())
+            emotion_score = self.config['emotion_weights'].get(emotion, 0)
+        except Exception as e:
+            emotion = "unknown"
+            emotion_score = 0
+            emotion_confidence = 0
+            self.logger.error(f"Emotion analysis failed: {str(e)}")
+        return emotion, emotion_confidence, emotion_score
+
+    def flush_emotions(self):
+        """
+        Classify the queued face crops in one batch and fill in their scores
+        """
+        if not self._pending_emotions:
+            return
+
+        started = self.stage_timer.start()
+        crops = [crop for crop, _ in self._pending_emotions]
+        try:
+            predictions = self.emotion_engine.predict(crops)
+        except Exception as e:
+            predictions = [("unknown", 0)] * len(crops)
+            self.logger.error(f"Emotion analysis failed: {str(e)}")
+
+        for (_, positions), (emotion, emotion_confidence) in zip(self._pending_emotions, predictions):
+            emotion_score = self.config['emotion_weights'].get(emotion, 0)
+            self.analysis_results.add_emotion(positions, emotion_score)
+            self._last_emotion = (emotion, emotion_confidence, emotion_score)
+
+        self._pending_emotions = []
+        self.stage_timer.record('emotion_batch', started)
+        self.stage_timer.increment('emotion_batches')
+
+    def _emotion_due(self, timestamp):
+        """
+        Run emotion on the first analyzed frame of every 1 / emotion_rate second window
+        """
+        rate = self.config['emotion_rate']
+        if not rate or timestamp is None:
+            return True
+
+        bucket = math.floor(timestamp * rate)
+        if self.emotion_samples and bucket == self._emotion_bucket:
+            return False
+        self._emotion_bucket = bucket
+        return True
+
+    def measure_motion(self, frame):
+        """
+        Cheap change signal between consecutive analyzed frames: the larger of the
+        thumbnail difference and the mean displacement of key pose landmarks
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumbnail = cv2.resize(gray, (64, 36), interpolation=cv2.INTER_AREA)
+        frame_motion = 0.0
+        if self._prev_thumbnail is not None:
+            frame_motion = float(np.mean(cv2.absdiff(thumbnail, self._prev_thumbnail))) / 255
+        self._prev_thumbnail = thumbnail
+
+        points = None
+        if self._last_pose_points is not None:
+            points = self._last_pose_points[POSE_MOTION_POINTS, :2]
+
+        landmark_motion = 0.0
+        if points is not None and self._prev_pose_points is not None:
+            landmark_motion = float(np.mean(np.linalg.norm(points - self._prev_pose_points, axis=1)))
+        self._prev_pose_points = points
+
+        return max(frame_motion, landmark_motion)
 
     def generate_interview_report(self):
         """
         Generate a comprehensive JSON report of the interview analysis
         """
+        self.flush_emotions()
+
+        results = self.analysis_results
+        timer = self.stage_timer
+
         # Safety check for empty analysis results
-        if not self.analysis_results['posture_details']:
+        if not results.count:
             return {
                 'timestamp': datetime.now().isoformat(),
                 'error': 'No analysis data available',
                 'summary': {},
                 'detailed_analysis': {},
-                'final_assessment': {}
+                'final_assessment': {},
+                'sampling': self.sampling_stats,
+                'quality_tier': self.config['quality_tier'],
+                'timing': timer.summary()
             }
 
-        # Robust extraction of posture scores
-        posture_scores = []
-        for details in self.analysis_results['posture_details']:
-            # Try different ways of extracting the score
-            if isinstance(details, dict):
-                posture_score = (
-                    details.get('score') or  # First try 'score'
-                    details.get('posture_score') or  # Then try 'posture_score'
-                    (details['details']['score'] if 'details' in details else 0)  # Then try nested score
-                )
-                posture_scores.append(posture_score)
-            elif isinstance(details, (int, float)):
-                posture_scores.append(details)
-            else:
-                posture_scores.append(0)  # Fallback to 0 if can't extract score
-
-        # Similar robust handling for other scores
-        emotion_scores = [
-            score if isinstance(score, (int, float)) else 0 
-            for score in self.analysis_results['emotion_history']
-        ]
-        eye_contact_scores = [
-            score if isinstance(score, (int, float)) else 0 
-            for score in self.analysis_results['eye_contact_history']
-        ]
-        total_scores = [
-            score if isinstance(score, (int, float)) else 0 
-            for score in self.analysis_results['total_scores']
-        ]
-
-        # Ensure we have at least some data to work with
-        posture_scores = posture_scores or [0]
-        emotion_scores = emotion_scores or [0]
-        eye_contact_scores = eye_contact_scores or [0]
-        total_scores = total_scores or [0]
+        # Averages come from the running sums, no pass over the frames is needed.
+        # Tiers without emotion analysis report it as not measured instead of as zeros
+        emotion_measured = self.config['emotion_enabled']
+        avg_posture = results.mean('posture')
+        avg_emotion = results.mean('emotion') if emotion_measured else None
+        avg_eye_contact = results.mean('eye_contact')
+
+        detailed_analysis = {
+            'posture_scores': results.series('posture').tolist(),
+            'posture_status_counts': results.posture_status_counts,
+            'deduction_counts': results.deduction_counts,
+            'emotion_details': results.series('emotion').tolist() if emotion_measured else [],
+            'eye_contact_details': results.series('eye_contact').tolist()
+        }
+        if results.frame_details is not None:
+            detailed_analysis['posture_details'] = results.frame_details
 
         # Detailed analysis
         report = {
             'timestamp': datetime.now().isoformat(),
             'summary': {
-                'avg_posture_score': np.mean(posture_scores),
-                'avg_emotion_score': np.mean(emotion_scores),
-                'avg_eye_contact_score': np.mean(eye_contact_scores),
-                'overall_score': np.mean(total_scores)
-            },
-            'detailed_analysis': {
-                'posture_details': self.analysis_results['posture_details'],
-                'emotion_details': self.analysis_results['emotion_history'],
-                'eye_contact_details': self.analysis_results['eye_contact_history']
+                'avg_posture_score': avg_posture,
+                'avg_emotion_score': avg_emotion,
+                'avg_eye_contact_score': avg_eye_contact,
+                'overall_score': results.mean('total')
             },
+            'detailed_analysis': detailed_analysis,
             'final_assessment': self._generate_final_assessment(
-                posture_scores, emotion_scores, eye_contact_scores
-            )
+                avg_posture, avg_emotion, avg_eye_contact
+            ),
+            'sampling': self.sampling_stats,
+            'quality_tier': self.config['quality_tier'],
+            'timing': timer.summary()
         }
 
         # Save report
+        started = timer.start()
         report_filename = f".\interview_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(report_filename, 'w') as f:
-            json.dump(report, f, indent=4)
+            json.dump(report, f)
+        timer.record('report_serialization', started)
+
+        if timer.enabled:
+            # The saved file cannot contain its own serialization time, the returned report does
+            report['timing'] = timer.summary()
+            timer.emit(frames=results.count, quality_tier=self.config['quality_tier'])
 
         self.logger.info(f"Interview report generated: {report_filename}")
         return report
 
-    def _generate_final_assessment(self, posture_scores, emotion_scores, eye_contact_scores):
+    def _generate_final_assessment(self, avg_posture, avg_emotion, avg_eye_contact):
         """
         Generate a comprehensive final assessment out of 100 marks
+
+        avg_emotion is None when emotion was not analyzed (e.g. the lite tier), the
+        100 marks are then split between posture and eye contact only.
         """
-        # Calculate individual component scores (max 33.33 points each)
-        posture_max = 33.33
-        emotion_max = 33.33
-        eye_contact_max = 33.34
+        emotion_measured = avg_emotion is not None
+
+        # Calculate individual component scores (max 33.33 points each, 50 without emotion)
+        if emotion_measured:
+            posture_max = 33.33
+            emotion_max = 33.33
+            eye_contact_max = 33.34
+        else:
+            posture_max = 50.0
+            emotion_max = 0.0
+            eye_contact_max = 50.0
 
         # Normalize and score posture (looking for values around 5-8 as good)
-        avg_posture = np.mean(posture_scores)
         posture_points = self._normalize_score(avg_posture, min_good=3, max_good=8) * posture_max
 
         # Normalize emotion scores (positive scores are good)
-        avg_emotion = np.mean(emotion_scores)
-        emotion_points = self._normalize_emotion_score(avg_emotion) * emotion_max
+        emotion_points = self._normalize_emotion_score(avg_emotion) * emotion_max if emotion_measured else 0.0
 
         # Normalize eye contact scores
-        avg_eye_contact = np.mean(eye_contact_scores)
         eye_contact_points = self._normalize_score(avg_eye_contact, min_good=-1, max_good=3) * eye_contact_max
 
         # Calculate total score
         total_score = posture_points + emotion_points + eye_contact_points
 
+        if emotion_measured:
+            emotion_component = {
+                'points': round(emotion_points, 2),
+                'max_points': emotion_max,
+                'raw_avg': round(avg_emotion, 2),
+                'measured': True
+            }
+        else:
+            emotion_component = {
+                'points': None,
+                'max_points': emotion_max,
+                'raw_avg': None,
+                'measured': False
+            }
+
         # Prepare detailed assessment
         assessment = {
             'total_score': round(total_score, 2),
@@ -378,11 +677,7 @@ class AIInterviewerAnalyzer:
                     'max_points': posture_max,
                     'raw_avg': round(avg_posture, 2)
                 },
-                'emotional_engagement': {
-                    'points': round(emotion_points, 2),
-                    'max_points': emotion_max,
-                    'raw_avg': round(avg_emotion, 2)
-                },
+                'emotional_engagement': emotion_component,
                 'eye_contact': {
                     'points': round(eye_contact_points, 2),
                     'max_points': eye_contact_max,
@@ -399,10 +694,11 @@ class AIInterviewerAnalyzer:
         else:
             assessment['areas_for_improvement'].append("Body Language & Posture")
 
-        if emotion_points > emotion_max * 0.7:
-            assessment['strengths'].append("Emotional Expression")
-        else:
-            assessment['areas_for_improvement'].append("Emotional Expression")
+        if emotion_measured:
+            if emotion_points > emotion_max * 0.7:
+                assessment['strengths'].append("Emotional Expression")
+            else:
+                assessment['areas_for_improvement'].append("Emotional Expression")
 
         if eye_contact_points > eye_contact_max * 0.7:
             assessment['strengths'].append("Eye Contact & Attentiveness")
@@ -438,61 +734,233 @@ class AIInterviewerAnalyzer:
         Args:
             video_path (str): Path to the input video file
         """
-        # Open video file
-        cap = cv2.VideoCapture(video_path)
+        if self.config['num_workers'] > 1:
+            segments = self._plan_segments(video_path, self.config['num_workers'])
+            if segments:
+                return self._run_parallel_analysis(video_path, segments)
+
+        if not self.analyze_video_segment(video_path):
+            return None
+
+        # Generate final report
+        report = self.generate_interview_report()
+        return report
+
+    def analyze_video_segment(self, video_path, start_frame=0, end_frame=None):
+        """
+        Analyze the frames in [start_frame, end_frame) of a video file
+
+        Frames are sampled by their absolute index, so a video split into segments
+        samples exactly the same frames as a single pass over the whole file.
+
+        Returns:
+            bool: False if the video could not be opened
+        """
+        # Decode sampled frames on a background thread, skipping the rest with grab()
+        source = FrameSource(
+            video_path,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            inference_width=self.config['inference_width'],
+            queue_size=self.config['prefetch_frames']
+        )
         
-        if not cap.isOpened():
+        if not source.open():
             self.logger.error(f"Could not open video file: {video_path}")
-            return None
+            return False
 
-        # Video properties
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
+        scheduler = SamplingScheduler.from_config(self.config, source.fps)
+        source.should_sample = scheduler.should_sample
+        adaptive = scheduler.mode == 'adaptive'
+
+        # Preallocate the score columns for the expected number of samples
+        segment_end = end_frame if end_frame is not None else source.total_frames
+        self.analysis_results.reserve(
+            self.analysis_results.count + scheduler.expected_samples(segment_end - start_frame)
+        )
 
         self.running = True
-        frame_count = 0
+        debug_display = self.config['debug_display']
 
+        # Build the Mediapipe graphs once per video unless the caller already holds a session
+        owns_session = self.config['persistent_session'] and self._session is None
+        if owns_session:
+            self.start_session()
+
+        timer = self.stage_timer
+        segment_started = started = timer.start()
         try:
-            while self.running:
-                ret, frame = cap.read()
-                
-                # Break if no more frames
-                if not ret:
+            for frame_count, frame in source:
+                # Time spent waiting on the decoder thread for the next sampled frame
+                timer.record('decode', started)
+                if not self.running:
                     break
 
-                # Process every 5th frame to reduce computational load
-                if frame_count % 5 == 0:
-                    annotated_frame, score, posture_details = self.process_frame(frame)
-                    
-                    # Optional: show progress
-                    print(f"Processing frame {frame_count}/{total_frames}")
+                timestamp = frame_count / source.fps if source.fps > 0 else None
+                annotated_frame, score, posture_details = self.process_frame(frame, timestamp)
+                started = timer.start()
+                scheduler.observe(frame_count, self.measure_motion(frame) if adaptive else None)
+                started = timer.record('motion', started) if adaptive else started
+                self.logger.debug(f"Processing frame {frame_count}/{source.total_frames}")
 
-                    # Optional: display frame (comment out if not needed)
+                if debug_display:
                     cv2.imshow('Advanced AI Interviewer', annotated_frame)
 
                     # Quit with 'q'
                     if cv2.waitKey(1) & 0xFF == ord('q'):
                         break
-
-                frame_count += 1
+                    started = timer.record('display', started)
 
         except Exception as e:
             self.logger.error(f"Unexpected error during video analysis: {str(e)}")
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
-            
-            # Generate and print final report
-            report = self.generate_interview_report()
-            print(report)
-            return report
-
-def main():
-    
-    video_path = "path.mkv"
-    
-    interviewer = AIInterviewerAnalyzer()
-    interviewer.run_interview_analysis(video_path)
+            source.close()
+            self.flush_emotions()
+            if debug_display:
+                cv2.destroyAllWindows()
+            if owns_session:
+                self.close_session()
+            timer.record('segment', segment_started)
+
+        self.sampling_stats = scheduler.stats(source.total_frames)
+        self.sampling_stats['emotion_samples'] = self.emotion_samples
+        return True
+
+    def _plan_segments(self, video_path, num_workers):
+        """
+        Split a video into contiguous frame ranges, one per worker
+
+        Segment boundaries fall on multiples of the frame stride, moved forward to
+        where a serial run samples emotion. Returns None when the frame count is
+        unknown (e.g. streamed webm) so the caller runs serially.
+        """
+        cap = cv2.VideoCapture(video_path)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0.0
+        cap.release()
+
+        frame_stride = self.config['frame_stride']
+        total_samples = math.ceil(total_frames / frame_stride) if total_frames > 0 else 0
+        num_workers = min(num_workers, total_samples)
+        if num_workers <= 1:
+            return None
+
+        segment_length = math.ceil(total_samples / num_workers) * frame_stride
+        scheduler = SamplingScheduler.from_config(self.config, fps)
+        boundaries = [0]
+        for start in range(segment_length, total_frames, segment_length):
+            boundary = self._emotion_aligned_boundary(max(start, boundaries[-1]), total_frames, scheduler)
+            if boundaries[-1] < boundary < total_frames:
+                boundaries.append(boundary)
+        if len(boundaries) <= 1:
+            return None
+
+        boundaries.append(total_frames)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def _emotion_aligned_boundary(self, boundary, total_frames, scheduler):
+        """
+        Move a segment boundary forward to the next sampled frame that starts a new
+        1 / emotion_rate window
+
+        A worker always runs emotion on its first sampled frame, so starting a
+        segment where the serial run samples emotion as well keeps the held emotion
+        results identical. Adaptive sampling depends on the motion history and is
+        not aligned.
+        """
+        rate = self.config['emotion_rate']
+        if not rate or not self.config['emotion_enabled'] or not scheduler.fps or scheduler.mode == 'adaptive':
+            return boundary
+
+        def bucket(frame_index):
+            # Same timestamp computation as analyze_video_segment and _emotion_due
+            return math.floor((frame_index / scheduler.fps) * rate)
+
+        previous = next(
+            (frame_index for frame_index in range(boundary - 1, -1, -1) if scheduler.should_sample(frame_index)),
+            None
+        )
+        for frame_index in range(boundary, total_frames):
+            if not scheduler.should_sample(frame_index):
+                continue
+            if previous is None or bucket(frame_index) != bucket(previous):
+                return frame_index
+            previous = frame_index
+        return total_frames
+
+    def _run_parallel_analysis(self, video_path, segments):
+        """
+        Analyze video segments in a process pool and merge them into one report
+
+        Stride and rate sampling depend only on the frame index and segments start
+        on emotion windows, so both match a serial run. Adaptive sampling restarts
+        its motion tracking, and with it the emotion windows, in every segment.
+        """
+        # Workers never open a preview window
+        worker_config = {**self.config, 'debug_display': False}
+
+        started = self.stage_timer.start()
+
+        # Spawned workers start from a clean interpreter, which Mediapipe requires
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=len(segments), mp_context=context) as executor:
+            futures = [
+                executor.submit(_analyze_segment_worker, worker_config, video_path, start, end)
+                for start, end in segments
+            ]
+            segment_results = [future.result() for future in futures]
+
+        if any(results is None for results in segment_results):
+            self.logger.error(f"Could not open video file: {video_path}")
+            return None
+
+        self.stage_timer.record('parallel_analysis', started)
+
+        # Segments are merged in frame order so the histories match a serial run
+        for results, stats, timer in segment_results:
+            self.analysis_results.merge(results)
+            self.stage_timer.merge(timer)
+
+        sampling_stats = [stats for _, stats, _ in segment_results]
+        total_frames = segments[-1][1]
+        fps = sampling_stats[0]['fps']
+        frames_analyzed = sum(stats['frames_analyzed'] for stats in sampling_stats)
+        self.sampling_stats = {
+            'mode': sampling_stats[0]['mode'],
+            'frames_analyzed': frames_analyzed,
+            'total_frames': total_frames,
+            'fps': fps,
+            'effective_rate': round(frames_analyzed * fps / total_frames, 2) if fps else None,
+            'emotion_samples': sum(stats['emotion_samples'] for stats in sampling_stats)
+        }
+
+        return self.generate_interview_report()
+
+def _analyze_segment_worker(config, video_path, start_frame, end_frame):
+    """
+    Process pool entry point: analyze one segment with a dedicated analyzer
+    """
+    analyzer = AIInterviewerAnalyzer(config=config)
+    if not analyzer.analyze_video_segment(video_path, start_frame, end_frame):
+        return None
+    return analyzer.analysis_results, analyzer.sampling_stats, analyzer.stage_timer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze the gestures of an interview video")
+    parser.add_argument('video_path')
+    parser.add_argument('--config', default='config.json', help='analyzer JSON config')
+    parser.add_argument('--quality-tier', default=None, choices=sorted(QUALITY_TIERS))
+    parser.add_argument('--headless', action='store_true', help='do not open the preview window')
+    parser.add_argument('--profile', action='store_true', help='include stage timing in the report')
+    args = parser.parse_args(argv)
+
+    interviewer = AIInterviewerAnalyzer(args.config, quality_tier=args.quality_tier)
+    # Running the script directly is a local debugging session
+    interviewer.config['debug_display'] = not args.headless
+    interviewer.config['profile_stages'] = args.profile
+    interviewer.stage_timer = make_stage_timer(args.profile)
+    report = interviewer.run_interview_analysis(args.video_path)
+    print(report)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,32 @@
+# Named gesture analysis quality tiers, applied on top of the analyzer config.
+# Kept free of heavy imports so the API can validate tiers without loading Mediapipe.
+QUALITY_TIERS = {
+    # Cheapest tier: light pose model, small frames, few samples and no emotion model
+    'lite': {
+        'model_complexity': 0,
+        'inference_width': 480,
+        'sampling_mode': 'rate',
+        'sample_rate': 2.0,
+        'refine_face_landmarks': False,
+        'emotion_enabled': False
+    },
+    'balanced': {
+        'model_complexity': 1,
+        'inference_width': 640,
+        'sampling_mode': 'rate',
+        'sample_rate': 6.0,
+        'refine_face_landmarks': False,
+        'emotion_enabled': True
+    },
+    # Full resolution, heavy pose model, iris-refined face mesh and a higher sampling rate
+    'accurate': {
+        'model_complexity': 2,
+        'inference_width': None,
+        'sampling_mode': 'rate',
+        'sample_rate': 10.0,
+        'refine_face_landmarks': True,
+        'emotion_enabled': True
+    }
+}
+
+DEFAULT_QUALITY_TIER = 'balanced'
@@ -0,0 +1,121 @@
+import numpy as np
+
+# Per-frame score columns kept by AnalysisResults
+SCORE_COLUMNS = ('posture', 'emotion', 'eye_contact', 'total')
+# Scores come from the configurable weights, which may be fractional
+SCORE_DTYPE = np.float32
+
+
+class AnalysisResults:
+    """
+    Compact storage for per-frame gesture analysis scores
+
+    Running sums give the report averages in O(1) memory. Per-frame score
+    series are kept in preallocated float32 columns (a few bytes per frame), and
+    the full posture_details dicts are only retained when explicitly requested.
+    """
+
+    __slots__ = ('count', 'sums', 'columns', 'capacity', 'store_series', 'frame_details',
+                 'posture_status_counts', 'deduction_counts')
+
+    def __init__(self, store_series=True, store_frame_details=False, capacity=256):
+        """
+        Args:
+            store_series (bool): Keep per-frame score columns for the detailed report
+            store_frame_details (bool): Keep the full posture_details dict of every frame
+            capacity (int): Initial number of frames the columns can hold before growing
+        """
+        self.count = 0
+        self.sums = dict.fromkeys(SCORE_COLUMNS, 0.0)
+        self.store_series = store_series
+        self.capacity = capacity if store_series else 0
+        self.columns = {name: np.zeros(self.capacity, dtype=SCORE_DTYPE) for name in SCORE_COLUMNS}
+        self.frame_details = [] if store_frame_details else None
+        self.posture_status_counts = {}
+        self.deduction_counts = {}
+
+    def reserve(self, capacity):
+        """
+        Grow the columns to hold at least capacity frames
+        """
+        if not self.store_series or capacity <= self.capacity:
+            return
+        for name in SCORE_COLUMNS:
+            column = np.zeros(capacity, dtype=SCORE_DTYPE)
+            column[:self.count] = self.columns[name][:self.count]
+            self.columns[name] = column
+        self.capacity = capacity
+
+    def append(self, posture_details, posture_score, emotion_score, eye_contact_score):
+        """
+        Record one analyzed frame
+
+        Returns:
+            int: Position of the frame, used to fill in a deferred emotion score
+        """
+        position = self.count
+        total_score = posture_score + emotion_score + eye_contact_score
+        scores = {
+            'posture': posture_score,
+            'emotion': emotion_score,
+            'eye_contact': eye_contact_score,
+            'total': total_score
+        }
+
+        if self.store_series:
+            if position >= self.capacity:
+                self.reserve(max(2 * self.capacity, 256))
+            for name, score in scores.items():
+                self.columns[name][position] = score
+        for name, score in scores.items():
+            self.sums[name] += score
+
+        if posture_details:
+            status = posture_details['status']
+            self.posture_status_counts[status] = self.posture_status_counts.get(status, 0) + 1
+            for reason in posture_details['deduction_reasons']:
+                self.deduction_counts[reason] = self.deduction_counts.get(reason, 0) + 1
+        if self.frame_details is not None:
+            self.frame_details.append(posture_details)
+
+        self.count += 1
+        return position
+
+    def add_emotion(self, positions, emotion_score):
+        """
+        Add a deferred emotion score to frames recorded with an emotion score of 0
+        """
+        self.sums['emotion'] += emotion_score * len(positions)
+        self.sums['total'] += emotion_score * len(positions)
+        if self.store_series:
+            self.columns['emotion'][positions] += emotion_score
+            self.columns['total'][positions] += emotion_score
+
+    def merge(self, other):
+        """
+        Append the frames of another result set, e.g. a later video segment
+        """
+        if self.store_series:
+            self.reserve(self.count + other.count)
+            for name in SCORE_COLUMNS:
+                self.columns[name][self.count:self.count + other.count] = other.series(name)
+        for name in SCORE_COLUMNS:
+            self.sums[name] += other.sums[name]
+        for status, count in other.posture_status_counts.items():
+            self.posture_status_counts[status] = self.posture_status_counts.get(status, 0) + count
+        for reason, count in other.deduction_counts.items():
+            self.deduction_counts[reason] = self.deduction_counts.get(reason, 0) + count
+        if self.frame_details is not None and other.frame_details is not None:
+            self.frame_details.extend(other.frame_details)
+        self.count += other.count
+
+    def mean(self, name):
+        return self.sums[name] / self.count if self.count else 0.0
+
+    def series(self, name):
+        """
+        Per-frame scores of one column, empty when series are not stored
+        """
+        if not self.store_series:
+            return np.zeros(0, dtype=SCORE_DTYPE)
+        return self.columns[name][:self.count]
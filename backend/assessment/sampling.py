@@ -0,0 +1,124 @@
+import math
+import threading
+
+
+class SamplingScheduler:
+    """
+    Decide which decoded frames are sent to the analyzers
+
+    Modes:
+        stride   - every Nth frame, regardless of fps
+        rate     - a fixed number of analyses per second of video
+        adaptive - starts at the target rate, speeds up while the candidate
+                   moves and backs off during still segments
+
+    should_sample() is called from the frame source thread while observe()
+    is called by the consumer after each analysis, so shared state is guarded
+    by a lock.
+    """
+
+    def __init__(self, mode='stride', fps=0.0, frame_stride=5, sample_rate=6.0,
+                 min_sample_rate=2.0, max_sample_rate=12.0, motion_threshold=0.02):
+        if mode not in ('stride', 'rate', 'adaptive'):
+            raise ValueError(f"Unknown sampling mode: {mode}")
+
+        # Without a usable fps there is no time base, fall back to a fixed stride
+        if not fps or math.isnan(fps) or fps <= 0:
+            mode = 'stride'
+            fps = 0.0
+
+        self.mode = mode
+        self.fps = fps
+        self.frame_stride = frame_stride
+        self.sample_rate = sample_rate
+        self.min_sample_rate = min_sample_rate
+        self.max_sample_rate = max_sample_rate
+        self.motion_threshold = motion_threshold
+
+        self.current_rate = sample_rate
+        self.frames_analyzed = 0
+        self.last_frame_index = None
+        self._next_due = None
+        self._last_sampled = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, fps):
+        return cls(
+            mode=config['sampling_mode'],
+            fps=fps,
+            frame_stride=config['frame_stride'],
+            sample_rate=config['sample_rate'],
+            min_sample_rate=config['min_sample_rate'],
+            max_sample_rate=config['max_sample_rate'],
+            motion_threshold=config['motion_threshold']
+        )
+
+    def should_sample(self, frame_index):
+        """
+        Return True if the frame at frame_index should be analyzed
+        """
+        if self.mode == 'stride':
+            return frame_index % self.frame_stride == 0
+
+        if self.mode == 'rate':
+            # A pure function of the frame index, so parallel segments agree with a serial pass
+            if frame_index == 0:
+                return True
+            step = self.sample_rate / self.fps
+            return math.floor(frame_index * step) != math.floor((frame_index - 1) * step)
+
+        with self._lock:
+            if self._next_due is None or frame_index >= self._next_due:
+                self._last_sampled = frame_index
+                self._next_due = frame_index + self.fps / self.current_rate
+                return True
+            return False
+
+    def observe(self, frame_index, motion=None):
+        """
+        Record an analyzed frame and, in adaptive mode, adjust the rate to its motion
+
+        Args:
+            frame_index (int): Index of the analyzed frame
+            motion (float): Normalized change since the previous analyzed frame
+        """
+        with self._lock:
+            self.frames_analyzed += 1
+            self.last_frame_index = frame_index
+
+            if self.mode != 'adaptive' or motion is None:
+                return
+
+            if motion > self.motion_threshold:
+                self.current_rate = min(self.max_sample_rate, self.current_rate * 1.5)
+            else:
+                self.current_rate = max(self.min_sample_rate, self.current_rate * 0.8)
+
+            # Pull the next sample forward straight away when the rate goes up
+            if self._last_sampled is not None:
+                self._next_due = min(self._next_due, self._last_sampled + self.fps / self.current_rate)
+
+    def expected_samples(self, frame_count):
+        """
+        Upper estimate of how many of frame_count frames will be sampled
+        """
+        if frame_count <= 0:
+            return 0
+        if self.mode == 'stride':
+            return math.ceil(frame_count / self.frame_stride)
+        rate = self.sample_rate if self.mode == 'rate' else self.max_sample_rate
+        return math.ceil(frame_count * min(rate / self.fps, 1)) + 1
+
+    def stats(self, total_frames=0):
+        """
+        Summarize how much of the video was analyzed
+        """
+        duration = total_frames / self.fps if self.fps and total_frames > 0 else None
+        return {
+            'mode': self.mode,
+            'frames_analyzed': self.frames_analyzed,
+            'total_frames': max(total_frames, 0),
+            'fps': self.fps,
+            'effective_rate': round(self.frames_analyzed / duration, 2) if duration else None
+        }
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from uuid import uuid4
+
+import numpy as np
+from decouple import config
+
+from assessment.acoustics import extend_frame_energy, frame_energy_db, metrics_from_energy, HOP_SECONDS
+from assessment.audio_decode import DecodedAudio, StreamingDecoder
+
+logger = logging.getLogger(__name__)
+
+# Transcribe the stream while it is recorded, off leaves the transcript to Gemini.
+# The local transcript replaces Gemini's, so only turn this on when ASR_MODEL and
+# ASR_LANGUAGE match the language the answers are assessed in (the default is Hindi)
+STREAM_TRANSCRIPTION = config('STREAM_TRANSCRIPTION', default=False, cast=bool)
+# Audio transcribed per rolling window, cut at the quietest point of its last seconds
+STREAM_WINDOW_SECONDS = config('STREAM_WINDOW_SECONDS', default=15.0, cast=float)
+STREAM_SPLIT_SEARCH_SECONDS = 2.0
+# Streams that receive nothing for this long are dropped
+STREAM_IDLE_SECONDS = config('STREAM_IDLE_SECONDS', default=600, cast=int)
+
+
+def quietest_split(samples, start, end, sample_rate):
+    '''
+    This function returns the sample index of the quietest frame near the end of
+    [start, end), so rolling windows are not cut in the middle of a word.
+    '''
+    search_start = max(start, end - int(STREAM_SPLIT_SEARCH_SECONDS * sample_rate))
+    energy = frame_energy_db(samples[search_start:end], sample_rate)
+    if not len(energy):
+        return end
+    return search_start + int(np.argmin(energy) * HOP_SECONDS * sample_rate)
+
+
+class AudioStream:
+    '''
+    An answer that is being recorded and uploaded in chunks.
+
+    Chunks are decoded as they arrive. Every time a full window of new audio
+    is available it is transcribed with the local ASR engine and the acoustic
+    metrics are refreshed, so when recording stops only the tail of the answer
+    is left to process.
+    '''
+
+    def __init__(self, owner, mime_type="audio/webm", transcribe=STREAM_TRANSCRIPTION):
+        self.stream_id = str(uuid4())
+        self.owner = owner
+        self.mime_type = mime_type
+        self.transcribe = transcribe
+        self.encoded = bytearray()
+        self.decoder = StreamingDecoder()
+        self.transcript_parts = []
+        self.transcribed_until = 0
+        self.transcription_failed = False
+        self.acoustic_metrics = None
+        # VAD frame energies of the audio decoded so far, extended as the stream grows
+        self.energy_db = np.zeros(0, dtype=np.float32)
+        self.measured_until = 0
+        self.finished = False
+        self.updated_at = time.monotonic()
+        # Bumped whenever the transcript or the metrics change
+        self.version = 0
+
+        self._update_lock = asyncio.Lock()
+        self._update_task = None
+
+    @property
+    def transcript(self):
+        '''
+        This function returns the transcript so far, None when it is not produced locally.
+        '''
+        if not self.transcribe or self.transcription_failed:
+            return None
+        return " ".join(part for part in self.transcript_parts if part).strip()
+
+    @property
+    def seconds(self):
+        return self.decoder.length / self.decoder.sample_rate
+
+    async def feed(self, chunk):
+        '''
+        This function adds an encoded chunk and schedules a rolling update in the background.
+        '''
+        if self.finished:
+            raise RuntimeError("Stream already finished")
+        self.encoded += chunk
+        self.updated_at = time.monotonic()
+        await asyncio.to_thread(self.decoder.write, chunk)
+
+        # One update at a time, chunks arriving meanwhile are picked up by the next one
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.create_task(self._update(final=False))
+
+    async def finish(self):
+        '''
+        This function decodes the remaining audio and completes the transcript and metrics.
+        '''
+        if self.finished:
+            return
+        await asyncio.to_thread(self.decoder.close)
+        await self._update(final=True)
+        self.finished = True
+
+    async def _update(self, final):
+        async with self._update_lock:
+            try:
+                await self._update_window(final)
+            except Exception as e:
+                # Runs as a background task while streaming, nobody awaits its result
+                logger.error(f"Stream {self.stream_id} update failed: {str(e)}")
+                if final:
+                    # Measured again from the whole answer when it is assessed
+                    self.acoustic_metrics = None
+
+    async def _update_window(self, final):
+        samples = self.decoder.samples
+        sample_rate = self.decoder.sample_rate
+        window = int(STREAM_WINDOW_SECONDS * sample_rate)
+        changed = False
+
+        if self.transcribe and not self.transcription_failed:
+            while len(samples) - self.transcribed_until >= window or (final and len(samples) > self.transcribed_until):
+                end = len(samples)
+                if end - self.transcribed_until >= window:
+                    end = quietest_split(samples, self.transcribed_until, self.transcribed_until + window, sample_rate)
+                await self._transcribe(samples[self.transcribed_until:end], sample_rate)
+                self.transcribed_until = end
+                changed = True
+                if self.transcription_failed:
+                    break
+
+        # Metrics are refreshed once per window, only the newly decoded frames are analyzed
+        if final or len(samples) - self.measured_until >= window:
+            self.energy_db = await asyncio.to_thread(extend_frame_energy, self.energy_db, samples, sample_rate)
+            self.acoustic_metrics = await asyncio.to_thread(
+                metrics_from_energy, self.energy_db, len(samples) / sample_rate, self.transcript
+            )
+            self.measured_until = len(samples)
+            changed = True
+
+        if changed:
+            self.version += 1
+
+    async def _transcribe(self, samples, sample_rate):
+        # The ASR stack is only imported once a stream actually transcribes
+        from assessment.audio import asr_engine
+
+        try:
+            text = await asyncio.to_thread(asr_engine.transcribe, {"raw": samples, "sampling_rate": sample_rate})
+            self.transcript_parts.append(text.strip())
+        except Exception as e:
+            # Gemini transcribes the answer instead
+            logger.error(f"Stream transcription failed: {str(e)}")
+            self.transcription_failed = True
+
+    def decoded_audio(self):
+        '''
+        This function returns the whole answer as a DecodedAudio that reuses the streamed PCM.
+        '''
+        return DecodedAudio(bytes(self.encoded), mime_type=self.mime_type, samples=self.decoder.samples)
+
+    def snapshot(self):
+        return {
+            "stream_id": self.stream_id,
+            "seconds": round(self.seconds, 2),
+            "transcript": self.transcript,
+            "acoustic_metrics": self.acoustic_metrics,
+            "finished": self.finished
+        }
+
+    async def close(self):
+        if self._update_task is not None:
+            self._update_task.cancel()
+            await asyncio.gather(self._update_task, return_exceptions=True)
+        if not self.finished:
+            await asyncio.to_thread(self.decoder.kill)
+
+
+class AudioStreamRegistry:
+    '''
+    Open audio streams of this API process, by stream id
+    '''
+
+    def __init__(self, idle_seconds=STREAM_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.streams = {}
+
+    async def create(self, owner, mime_type="audio/webm"):
+        await self.prune()
+        stream = await asyncio.to_thread(AudioStream, owner, mime_type)
+        self.streams[stream.stream_id] = stream
+        return stream
+
+    def get(self, stream_id, owner=None):
+        '''
+        Return the stream, or None if it does not exist or belongs to another owner
+        '''
+        stream = self.streams.get(stream_id)
+        if stream is None or (owner is not None and stream.owner != owner):
+            return None
+        return stream
+
+    async def discard(self, stream_id):
+        stream = self.streams.pop(stream_id, None)
+        if stream is not None:
+            await stream.close()
+
+    async def prune(self):
+        now = time.monotonic()
+        for stream_id, stream in list(self.streams.items()):
+            if now - stream.updated_at > self.idle_seconds:
+                await self.discard(stream_id)
+
+    async def close_all(self):
+        for stream_id in list(self.streams):
+            await self.discard(stream_id)
+
+
+audio_streams = AudioStreamRegistry()
@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+
+# Percentiles reported for every stage
+TIMING_PERCENTILES = (50, 90, 99)
+
+
+class StageTimer:
+    """
+    Record wall time per analysis stage and summarize it as percentiles
+
+    Timing is chained so every stage boundary costs one perf_counter() call:
+
+        started = timer.start()
+        ...
+        started = timer.record('landmarks', started)
+        ...
+        timer.record('posture', started)
+
+    An optional sink (any callable) receives the summary when emit() is called,
+    e.g. to forward it to an external metrics system.
+    """
+
+    enabled = True
+
+    def __init__(self, sink=None):
+        """
+        Args:
+            sink (callable): Called with the summary dict and extra labels by emit()
+        """
+        self.sink = sink
+        self.samples = {}
+        self.counts = {}
+
+    def start(self):
+        return time.perf_counter()
+
+    def record(self, stage, started):
+        """
+        Add the time elapsed since started to stage
+
+        Returns:
+            float: The current time, to be used as the start of the next stage
+        """
+        now = time.perf_counter()
+        samples = self.samples.get(stage)
+        if samples is None:
+            samples = self.samples[stage] = []
+        samples.append(now - started)
+        return now
+
+    def increment(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def merge(self, other):
+        """
+        Add the samples of another timer, e.g. from a parallel video segment
+        """
+        for stage, samples in other.samples.items():
+            self.samples.setdefault(stage, []).extend(samples)
+        for name, amount in other.counts.items():
+            self.increment(name, amount)
+
+    def summary(self):
+        """
+        Per-stage count, total, mean and percentiles in milliseconds
+        """
+        stages = {}
+        for stage, samples in self.samples.items():
+            values = np.asarray(samples) * 1000
+            percentiles = np.percentile(values, TIMING_PERCENTILES)
+            stages[stage] = {
+                'count': len(samples),
+                'total_ms': round(float(values.sum()), 3),
+                'mean_ms': round(float(values.mean()), 3),
+                'max_ms': round(float(values.max()), 3),
+                **{f"p{p}_ms": round(float(value), 3) for p, value in zip(TIMING_PERCENTILES, percentiles)}
+            }
+        return {'stages': stages, 'counts': dict(self.counts)}
+
+    def emit(self, **labels):
+        """
+        Send the summary to the sink, if one is set
+        """
+        if self.sink is not None:
+            self.sink(self.summary(), **labels)
+
+
+class NullStageTimer:
+    """
+    Drop-in StageTimer that records nothing, used when profiling is off
+    """
+
+    enabled = False
+    sink = None
+
+    def start(self):
+        return 0.0
+
+    def record(self, stage, started):
+        return 0.0
+
+    def increment(self, name, amount=1):
+        pass
+
+    def merge(self, other):
+        pass
+
+    def summary(self):
+        return None
+
+    def emit(self, **labels):
+        pass
+
+
+def make_stage_timer(enabled, sink=None):
+    return StageTimer(sink) if enabled else NullStageTimer()
@@ -0,0 +1,82 @@
+"""
+Measure the per-request cost of building Gemini models.
+
+Compares building the schema tree, generation config and GenerativeModel on
+every call (what each request used to do) with taking the shared instance from
+the registry. No request is sent to Gemini, so no API key or network is needed.
+Fails first if any MODEL_SPECS entry does not build a content.Schema.
+
+Usage (from the backend directory):
+    python -m benchmarks.gemini_models --iterations 200
+"""
+import argparse
+import json
+import statistics
+import time
+
+from google.ai.generativelanguage_v1beta.types import content
+
+from assessment.gemini_models import MODEL_SPECS, GeminiModelRegistry, build_model
+
+
+def time_calls(func, iterations):
+    """
+    Call func iterations times, return the per-call times in milliseconds
+    """
+    times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def check_schemas():
+    """
+    Every MODEL_SPECS entry must build a content.Schema and a model from it
+    """
+    for name, (schema_factory, _) in MODEL_SPECS.items():
+        schema = schema_factory()
+        if not isinstance(schema, content.Schema):
+            raise SystemExit(f"FAIL: schema of {name} is a {type(schema).__name__}, not a content.Schema")
+        build_model(name)
+
+
+def describe(times):
+    return {
+        'mean_ms': round(statistics.mean(times), 4),
+        'p50_ms': round(statistics.median(times), 4),
+        'max_ms': round(max(times), 4)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200, help='calls per model and mode')
+    parser.add_argument('--output', default=None, help='write the results as JSON')
+    args = parser.parse_args(argv)
+
+    check_schemas()
+
+    registry = GeminiModelRegistry(MODEL_SPECS)
+    build_started = time.perf_counter()
+    registry.build_all()
+    build_all_seconds = time.perf_counter() - build_started
+    print(f"Registry built {len(MODEL_SPECS)} models in {build_all_seconds * 1000:.2f}ms")
+
+    results = {'build_all_ms': round(build_all_seconds * 1000, 3), 'models': {}}
+    print(f"{'model':40s} {'per call':>12s} {'registry':>12s} {'saved':>10s}")
+    for name in MODEL_SPECS:
+        per_call = describe(time_calls(lambda: build_model(name), args.iterations))
+        shared = describe(time_calls(lambda: registry.get(name), args.iterations))
+        results['models'][name] = {'per_call': per_call, 'registry': shared}
+        print(f"{name:40s} {per_call['mean_ms']:10.4f}ms {shared['mean_ms']:10.4f}ms "
+              f"{per_call['mean_ms'] - shared['mean_ms']:8.4f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
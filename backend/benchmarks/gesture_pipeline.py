@@ -0,0 +1,235 @@
+"""
+Benchmark the full gesture pipeline (run_interview_analysis) on synthetic videos.
+
+Videos are generated locally for every combination of resolution, fps and
+duration, then each case is analyzed in a fresh process so peak RSS is measured
+per case. Results are written as JSON so runs from different commits can be
+compared with --baseline.
+
+Usage (from the backend directory):
+    python -m benchmarks.gesture_pipeline --resolutions 640x360,1280x720 --fps 15,30 \\
+        --durations 10 --output gesture_bench.json
+    python -m benchmarks.gesture_pipeline --baseline gesture_bench.json --output new.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+def parse_list(value, cast):
+    return [cast(item) for item in value.split(',') if item]
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def synthetic_video_path(video_dir, width, height, fps, duration):
+    return os.path.join(video_dir, f"synthetic_{width}x{height}_{fps:g}fps_{duration:g}s.mp4")
+
+
+def generate_synthetic_video(path, width, height, fps, duration, seed=0):
+    """
+    Write a video of a simple figure (head, torso, shoulders) that sways and
+    drifts over a noisy background, so decoding and motion are not trivial
+    """
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not create video writer for {path}")
+
+    frame_total = int(round(fps * duration))
+    unit = min(width, height)
+    for index in range(frame_total):
+        t = index / fps
+        frame = background.copy()
+        center_x = int(width / 2 + np.sin(t * 0.7) * width * 0.05)
+        sway = int(np.sin(t * 1.3) * unit * 0.02)
+
+        head_y = int(height * 0.3)
+        shoulder_y = int(height * 0.5)
+        cv2.rectangle(frame,
+                      (center_x - int(unit * 0.22), shoulder_y),
+                      (center_x + int(unit * 0.22), height),
+                      (90, 60, 160), -1)
+        cv2.line(frame,
+                 (center_x - int(unit * 0.22), shoulder_y + sway),
+                 (center_x + int(unit * 0.22), shoulder_y - sway),
+                 (200, 180, 160), max(unit // 60, 2))
+        cv2.ellipse(frame, (center_x + sway, head_y), (int(unit * 0.1), int(unit * 0.13)),
+                    0, 0, 360, (150, 180, 220), -1)
+        for offset in (-1, 1):
+            cv2.circle(frame, (center_x + sway + offset * int(unit * 0.04), head_y - int(unit * 0.02)),
+                       max(unit // 120, 2), (30, 30, 30), -1)
+        writer.write(frame)
+
+    writer.release()
+    return path
+
+
+def run_case(video_path, analyzer_config, quality_tier, workdir):
+    """
+    Child process entry point: analyze one video and report its measurements
+    """
+    from assessment.gesture import AIInterviewerAnalyzer
+
+    # The analyzer writes its report into the working directory
+    os.chdir(workdir)
+
+    start = time.perf_counter()
+    analyzer = AIInterviewerAnalyzer(config=analyzer_config, quality_tier=quality_tier)
+    init_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = analyzer.run_interview_analysis(video_path)
+    wall_time = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux, segment workers are counted separately
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+    if report is None:
+        return {'error': f"Could not analyze {video_path}"}
+
+    sampling = report.get('sampling', {})
+    frames_analyzed = sampling.get('frames_analyzed', 0)
+    total_frames = sampling.get('total_frames', 0)
+    fps = sampling.get('fps') or 0
+    video_duration = total_frames / fps if fps else None
+    return {
+        'init_time_s': round(init_time, 3),
+        'wall_time_s': round(wall_time, 3),
+        'frames_total': total_frames,
+        'frames_analyzed': frames_analyzed,
+        'analyzed_fps': round(frames_analyzed / wall_time, 2) if wall_time else None,
+        'video_fps_processed': round(total_frames / wall_time, 2) if wall_time else None,
+        'realtime_factor': round(video_duration / wall_time, 2) if video_duration and wall_time else None,
+        'peak_rss_mb': round(peak_rss, 1),
+        'peak_worker_rss_mb': round(children_rss, 1),
+        'stages': (report.get('timing') or {}).get('stages', {})
+    }
+
+
+def measure_case(video_path, analyzer_config, quality_tier, workdir):
+    """
+    Run one case in a spawned process so its peak RSS is not inflated by earlier cases
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (video_path, analyzer_config, quality_tier, workdir))
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'opencv': cv2.__version__
+    }
+
+
+def case_name(case):
+    return f"{case['width']}x{case['height']}@{case['fps']:g}fps/{case['duration']:g}s"
+
+
+def compare(results, baseline):
+    """
+    Print the change in analyzed fps and wall time against a previous results file
+    """
+    previous = {case_name(case): case for case in baseline['cases'] if 'error' not in case}
+    print(f"\nCompared with {baseline['environment'].get('commit')}:")
+    for case in results['cases']:
+        name = case_name(case)
+        old = previous.get(name)
+        if old is None or 'error' in case or not old.get('analyzed_fps'):
+            print(f"  {name:<28} no baseline")
+            continue
+        fps_change = (case['analyzed_fps'] - old['analyzed_fps']) / old['analyzed_fps'] * 100
+        wall_change = (case['wall_time_s'] - old['wall_time_s']) / old['wall_time_s'] * 100
+        print(f"  {name:<28} fps {fps_change:+6.1f}%  wall {wall_change:+6.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolutions', default='640x360,1280x720',
+                        help='comma separated WIDTHxHEIGHT list')
+    parser.add_argument('--fps', default='15,30', help='comma separated frame rates')
+    parser.add_argument('--durations', default='10', help='comma separated durations in seconds')
+    parser.add_argument('--quality-tier', default=None, help='quality tier applied to the analyzer')
+    parser.add_argument('--workers', type=int, default=1, help='num_workers of the analyzer')
+    parser.add_argument('--config', default='config.json', help='analyzer JSON config, defaults are used if missing')
+    parser.add_argument('--video-dir', default=os.path.join('.cache', 'benchmark_videos'),
+                        help='where synthetic videos are generated and reused')
+    parser.add_argument('--output', default='gesture_bench.json', help='JSON results file')
+    parser.add_argument('--baseline', default=None, help='previous results file to compare against')
+    args = parser.parse_args(argv)
+
+    from assessment.gesture import AIInterviewerAnalyzer
+
+    # Resolve the configuration once so every case runs with the same settings
+    analyzer_config = AIInterviewerAnalyzer(config_path=args.config).config
+    analyzer_config.update({'profile_stages': True, 'debug_display': False, 'num_workers': args.workers})
+
+    os.makedirs(args.video_dir, exist_ok=True)
+    video_dir = os.path.abspath(args.video_dir)
+    cases = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for width, height in parse_list(args.resolutions, parse_resolution):
+            for fps in parse_list(args.fps, float):
+                for duration in parse_list(args.durations, float):
+                    path = synthetic_video_path(video_dir, width, height, fps, duration)
+                    generate_synthetic_video(path, width, height, fps, duration)
+
+                    case = {'width': width, 'height': height, 'fps': fps, 'duration': duration}
+                    case.update(measure_case(path, analyzer_config, args.quality_tier, workdir))
+                    cases.append(case)
+
+                    if 'error' in case:
+                        print(f"{case_name(case):<28} {case['error']}")
+                    else:
+                        print(f"{case_name(case):<28} {case['analyzed_fps']:>8.2f} analyzed fps  "
+                              f"{case['wall_time_s']:>8.2f} s  {case['peak_rss_mb']:>8.1f} MB")
+
+    results = {
+        'environment': environment_info(),
+        'quality_tier': args.quality_tier,
+        'config': analyzer_config,
+        'cases': cases
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare gesture analysis throughput with per-frame Mediapipe construction
+against a persistent tracking session.
+
+Usage (from the backend directory):
+    python -m benchmarks.gesture_session path/to/video.mp4 --frames 60
+"""
+import argparse
+import time
+
+import cv2
+
+from assessment.gesture import AIInterviewerAnalyzer
+
+
+def load_frames(video_path, max_frames, stride=5):
+    """
+    Decode the sampled frames up front so only analysis time is measured
+    """
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    frame_count = 0
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_count % stride == 0:
+            frames.append(frame)
+        frame_count += 1
+    cap.release()
+    return frames
+
+
+def measure(frames, persistent_session):
+    """
+    Run process_frame over the frames and return the achieved frames per second
+    """
+    analyzer = AIInterviewerAnalyzer()
+    analyzer.config['persistent_session'] = persistent_session
+    if persistent_session:
+        analyzer.start_session()
+
+    start = time.perf_counter()
+    try:
+        for frame in frames:
+            analyzer.process_frame(frame)
+    finally:
+        analyzer.close_session()
+    elapsed = time.perf_counter() - start
+
+    return len(frames) / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('video_path')
+    parser.add_argument('--frames', type=int, default=60, help='number of sampled frames to analyze')
+    args = parser.parse_args()
+
+    frames = load_frames(args.video_path, args.frames)
+    if not frames:
+        raise SystemExit(f"No frames decoded from {args.video_path}")
+
+    per_frame_fps = measure(frames, persistent_session=False)
+    session_fps = measure(frames, persistent_session=True)
+
+    print(f"Frames analyzed:        {len(frames)}")
+    print(f"Per-frame construction: {per_frame_fps:.2f} fps")
+    print(f"Persistent session:     {session_fps:.2f} fps")
+    if per_frame_fps:
+        print(f"Speedup:                {session_fps / per_frame_fps:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
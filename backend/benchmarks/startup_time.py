@@ -0,0 +1,109 @@
+"""
+Measure how long `import main` takes and check it against a startup budget.
+
+Each run imports the app in a fresh interpreter with -X importtime, reports the
+wall time, the slowest top-level imports, and fails if any heavy ML framework
+was pulled in at import time or the median exceeds the budget.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup_time --runs 5 --budget 3.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Frameworks that must only be loaded on first use or by the lifespan warm-up
+HEAVY_MODULES = ('cv2', 'mediapipe', 'deepface', 'tensorflow', 'torch', 'transformers', 'matplotlib')
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+sys.stdout.write(json.dumps({{"import_time": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def run_import(module='main'):
+    """
+    Import the app in a fresh interpreter, return its import time, heavy modules
+    and the -X importtime log
+    """
+    script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{process.stderr}")
+    return json.loads(process.stdout), process.stderr
+
+
+def slowest_imports(importtime_log, top=10):
+    """
+    Top-level packages with the largest cumulative import time in microseconds
+    """
+    totals = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # Nesting is shown by indentation, top-level imports have a single leading space
+        if name.startswith('  '):
+            continue
+        name = name.strip()
+        totals[name] = max(totals.get(name, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='number of fresh interpreter imports')
+    parser.add_argument('--budget', type=float, default=3.0, help='maximum median import time in seconds')
+    parser.add_argument('--module', default='main', help='module to import')
+    parser.add_argument('--output', default=None, help='write the results as JSON')
+    args = parser.parse_args(argv)
+
+    times = []
+    heavy_modules = set()
+    importtime_log = ''
+    for _ in range(args.runs):
+        result, importtime_log = run_import(args.module)
+        times.append(result['import_time'])
+        heavy_modules.update(result['heavy_modules'])
+
+    median = statistics.median(times)
+    print(f"import {args.module}: median {median:.3f}s, min {min(times):.3f}s, max {max(times):.3f}s "
+          f"over {args.runs} runs (budget {args.budget:.2f}s)")
+    print("Slowest top-level imports:")
+    for name, microseconds in slowest_imports(importtime_log):
+        print(f"  {microseconds / 1e6:8.3f}s  {name}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'module': args.module,
+                'times': times,
+                'median': median,
+                'budget': args.budget,
+                'heavy_modules': sorted(heavy_modules),
+                'slowest_imports': slowest_imports(importtime_log)
+            }, f, indent=2)
+
+    failures = []
+    if heavy_modules:
+        failures.append(f"heavy modules loaded at import time: {', '.join(sorted(heavy_modules))}")
+    if median > args.budget:
+        failures.append(f"median import time {median:.3f}s exceeds the {args.budget:.2f}s budget")
+    if failures:
+        raise SystemExit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -104,7 +104,7 @@ class Database:
         user_object_id = ObjectId(user_id)
         
         # Encode the question to make it a valid MongoDB key
-        encoded_question = question.replace('.', '_').replace('$', '_').replace(' ', '_')
+        encoded_question = cls.encode_question(question)
         
         await cls.user_collection.update_one(
             {"_id": user_object_id},
@@ -114,6 +114,21 @@ class Database:
                 }
             }
         )
+
+    @classmethod
+    async def save_gesture_feedback(cls, user_id: str, quiz_id: str, question: str, video: str, gesture_feedback: dict):
+        # Stored as the third element of the [video, feedback] history entry, only if
+        # that entry is still for this video and was not replaced by a re-recording
+        user_object_id = ObjectId(user_id)
+        encoded_question = cls.encode_question(question)
+        await cls.user_collection.update_one(
+            {"_id": user_object_id, f"history.{quiz_id}.{encoded_question}.0": video},
+            {"$set": {f"history.{quiz_id}.{encoded_question}.2": gesture_feedback}}
+        )
+
+    @staticmethod
+    def encode_question(question: str):
+        return question.replace('.', '_').replace('$', '_').replace(' ', '_')
     
     @classmethod
     async def save_final_feedbacks(cls, final_feedbacks: dict, user_id: str, quiz_id: str):
@@ -3,12 +3,42 @@ from fastapi.middleware.cors import CORSMiddleware
 from db.init_db import Database
 from routes.auth import router as auth_router
 from routes.record import router_record as record_router
+from util.job_queue import gesture_jobs
+from util.result_cache import attach_mongo_caches
+from assessment.gestFeed import warm_up_gesture_models
+from assessment.streaming import audio_streams
+from assessment.gemini_models import gemini_models
 from contextlib import asynccontextmanager
+from decouple import config
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Models are loaded lazily on first use unless preloaded here at startup
+WARMUP_GESTURE_MODELS = config('WARMUP_GESTURE_MODELS', default=False, cast=bool)
+WARMUP_ASR_MODEL = config('WARMUP_ASR_MODEL', default=False, cast=bool)
+
+async def warm_up_models():
+    # Cheap, only builds schemas and configs, so every request gets a ready model
+    gemini_models.build_all()
+    if WARMUP_GESTURE_MODELS:
+        load_times = await gesture_jobs.warm_up(warm_up_gesture_models)
+        logger.info(f"Gesture models loaded in {max(load_times):.2f}s across {len(load_times)} workers")
+    if WARMUP_ASR_MODEL:
+        from assessment.audio import load_whisper_asr
+        load_time = await asyncio.to_thread(load_whisper_asr)
+        logger.info(f"ASR model loaded in {load_time:.2f}s")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await Database.connect_db()
+    await attach_mongo_caches(Database.client.commsense)
+    gesture_jobs.start()
+    await warm_up_models()
     yield
+    await audio_streams.close_all()
+    await gesture_jobs.shutdown()
     await Database.close_db()
 
 
@@ -1,18 +1,41 @@
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from db.init_db import Database
-from .auth import get_current_user
+from .auth import get_current_user, get_user_from_token
 import google.generativeai as genai
-from google.ai.generativelanguage_v1beta.types import content
 import os
 import dotenv
 import json
-from assessment.gemini import *
+from assessment.gemini import (
+    ASSESSMENT_VERSION,
+    get_candidate_assessment,
+    get_final_summary,
+    get_graph_data,
+    get_learning_from_feedbacks,
+    get_learning_from_input
+)
 import io
 from typing import List, Dict, Optional
 from pydantic import BaseModel, Field
 from uuid import uuid4
-from util.report_gen import *
+from util.report_gen import generate_feedback_report
+from util.job_queue import gesture_jobs
+from util.result_cache import assessment_cache, gesture_cache
+from assessment.gestFeed import get_gesture_feedback, get_gesture_cache_parts
+from assessment.quality_tiers import QUALITY_TIERS, DEFAULT_QUALITY_TIER
+from assessment.audio_decode import DecodedAudio
+from assessment.gemini_models import gemini_models
+from assessment.acoustics import ACOUSTICS_VERSION, measure_decoded_audio, measured_graph_data
+from assessment.streaming import audio_streams
+from functools import partial
+from decouple import config
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Off renders the report with the measured graphs only, without a Gemini call
+REPORT_QUALITATIVE_GRAPHS = config('REPORT_QUALITATIVE_GRAPHS', default=True, cast=bool)
 
 class FeedbackItem(BaseModel):
     question: str
@@ -67,7 +90,6 @@ from db.init_db import Database
 from .auth import get_current_user
 
 genai.configure(api_key=os.getenv('GOOGLE_AI_API_KEY'))
-model = genai.GenerativeModel('gemini-1.5-flash')
 
 router_record = APIRouter()
 
@@ -75,57 +97,9 @@ router_record = APIRouter()
 async def generate_questions(
     current_user: dict = Depends(get_current_user)
 ):
-    system_prompt = """Role: You are a communication coach designing engaging and insightful questions to assess and enhance people's speaking abilities.
-
-Objective: Develop 5 thought-provoking questions for a casual yet professional conversation that assess communication skills while encouraging self-reflection and depth.  Focus on questions that reveal the candidate's ability to articulate clearly, think critically, and engage naturally.  Avoid hypothetical scenarios or overly complex situations.
-
-Guidelines for the Questions:
-* Focus on real experiences and personal reflections.
-* Encourage storytelling and detailed responses.
-* Assess clarity of thought, articulation, and engagement.
-* Maintain a balance between light and thought-provoking.
-
-Questions:
-1. Tell me about a recent accomplishment you're proud of.
-2. What's a topic you're passionate about and why?
-3. Describe a time you had to explain something complex to someone unfamiliar with the subject.
-4. What's a skill you're currently working on improving, and how are you approaching it?
-5.  Tell me about a time you received constructive feedback. How did you respond?
-
-
-Outcome of Responses
-Gain insights into the candidate's ability to organize thoughts, articulate clearly, and connect with an audience.
-Evaluate their communication style, critical thinking, and ability to reflect on personal experiences.
-"""
-
-    generation_config = {
-        "temperature": 1,
-        "top_p": 0.95,
-        "top_k": 40,
-        "max_output_tokens": 8192,
-        "response_schema": content.Schema(
-            type = content.Type.OBJECT,
-            enum = [],
-            required = ["questions"],
-            properties = {
-            "questions": content.Schema(
-                type = content.Type.ARRAY,
-                items = content.Schema(
-                type = content.Type.STRING,
-                ),
-            ),
-            },
-        ),
-        "response_mime_type": "application/json",
-        }
-
-    model = genai.GenerativeModel(
-        model_name="gemini-1.5-flash",
-        generation_config=generation_config,
-        system_instruction=system_prompt
-    )
-
-    response = model.generate_content("Generate 5 professional communication assessment questions")
+    model = gemini_models.get("questions")
+
+    response = await model.generate_content_async("Generate 5 professional communication assessment questions")
 
     questions = json.loads(response.text)
     quiz_id = str(uuid4())
@@ -142,7 +116,7 @@ async def final_feedback(
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        response = get_final_summary(feedbacks=request.feedbackWithQuestions)
+        response = await get_final_summary(feedbacks=request.feedbackWithQuestions)
         await Database.save_final_feedbacks(response, current_user["_id"], request.currentQuizId)
         return response
     except Exception as e:
@@ -151,11 +125,25 @@ async def final_feedback(
 @router_record.post("/save-video")
 async def save_video(
     video_file: UploadFile = File(...),
-    audio_file: UploadFile = File(...),
+    audio_file: Optional[UploadFile] = File(None),
     question: str = Form(...),
     quiz_id: str = Form(...),
+    gesture_quality: str = Form(DEFAULT_QUALITY_TIER),
+    stream_id: Optional[str] = Form(None),
     current_user: dict = Depends(get_current_user)
 ):
+    if gesture_quality not in QUALITY_TIERS:
+        raise HTTPException(status_code=400, detail=f"Unknown gesture quality tier: {gesture_quality}")
+
+    # The answer audio was either streamed over /audio-stream while recording, or is uploaded now
+    stream = None
+    if stream_id is not None:
+        stream = audio_streams.get(stream_id, owner=current_user['_id'])
+        if stream is None:
+            raise HTTPException(status_code=404, detail="Audio stream not found")
+    elif audio_file is None:
+        raise HTTPException(status_code=400, detail="Either audio_file or stream_id is required")
+
     video_data = {
         "file": await video_file.read(),
         "filename": video_file.filename,
@@ -163,21 +151,43 @@ async def save_video(
         "user_id": str(current_user["_id"])
     }
  
-     # Read audio file into bytes
-    audio_bytes = await audio_file.read()
-    
-    # Create a temporary file-like object in memory
-    audio_buffer = io.BytesIO(audio_bytes)
-    audio_buffer.name = 'audio.webm'  # Give it a name for mime type detection
-
-    # verbal feedback
-    candidate_assess = get_candidate_assessment(question=question, file_url=audio_buffer)
-
-    # non-verbal feedback
-    # non_verbal_analyzer = CommunicationAnalyzer()
-    # non_verbal_feedback = await non_verbal_analyzer.analyze_communication(video_file)
-
-    # print(non_verbal_feedback)
+    if stream is not None:
+        # Only the tail of the answer is left to transcribe and measure
+        try:
+            await stream.finish()
+        except RuntimeError as e:
+            await audio_streams.discard(stream_id)
+            raise HTTPException(status_code=400, detail=str(e))
+        audio = stream.decoded_audio()
+        audio_bytes = audio.data
+        transcript = stream.transcript
+        acoustic_metrics = stream.acoustic_metrics if transcript is not None else None
+        await audio_streams.discard(stream_id)
+    else:
+        # Read audio file into bytes
+        audio_bytes = await audio_file.read()
+
+        # Shared by every audio consumer, decoded to PCM at most once and only when needed
+        audio_mime_type = (audio_file.content_type or "audio/webm").split(";")[0]
+        audio = DecodedAudio(audio_bytes, mime_type=audio_mime_type)
+        transcript = None
+        acoustic_metrics = None
+
+    # verbal feedback, reused when the same recording was already assessed for this question
+    assessment_key = assessment_cache.make_key(audio_bytes, question, ASSESSMENT_VERSION, ACOUSTICS_VERSION, transcript)
+    candidate_assess = await assessment_cache.get(assessment_key)
+    if candidate_assess is None:
+        candidate_assess = await get_candidate_assessment(question=question, file_url=audio, transcript=transcript)
+        # Measured locally from the decoded audio, next to Gemini's estimates
+        if acoustic_metrics is None:
+            try:
+                acoustic_metrics = await asyncio.to_thread(
+                    measure_decoded_audio, audio, candidate_assess.get("transcript")
+                )
+            except RuntimeError as e:
+                logger.error(f"Acoustic metrics failed: {str(e)}")
+        candidate_assess["acoustic_metrics"] = acoustic_metrics
+        await assessment_cache.set(assessment_key, candidate_assess)
 
     result = await Database.save_video(video_data)
 
@@ -185,9 +195,108 @@ async def save_video(
 
     await Database.save_history(current_user['_id'], vidUrl, candidate_assess, question, quiz_id)
 
+    # non-verbal feedback runs in the background on the stored video and is
+    # attached to the same history entry when it finishes
+    gesture_key = gesture_cache.make_key(video_data["file"], *get_gesture_cache_parts(gesture_quality))
+    gesture_feedback = await gesture_cache.get(gesture_key)
+    if gesture_feedback is not None:
+        await Database.save_gesture_feedback(current_user['_id'], quiz_id, question, vidUrl, gesture_feedback)
+        gesture_job_id = gesture_jobs.add_completed(gesture_feedback, owner=current_user['_id'])
+    else:
+        gesture_job_id = gesture_jobs.submit(
+            get_gesture_feedback, vidUrl, gesture_quality,
+            owner=current_user['_id'],
+            on_complete=partial(store_gesture_feedback, current_user['_id'], quiz_id, question, vidUrl, gesture_key)
+        )
+
     #give dict of question:video and question:feedback to Database functions
     
-    return {"url": vidUrl, "feedback": candidate_assess}
+    return {"url": vidUrl, "feedback": candidate_assess, "gesture_job_id": gesture_job_id}
+
+
+@router_record.websocket("/audio-stream")
+async def stream_audio(
+    websocket: WebSocket,
+    token: str,
+    mime_type: str = "audio/webm"
+):
+    # Browsers cannot set headers on WebSockets, the bearer token comes as a query parameter
+    try:
+        current_user = await get_user_from_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    stream = await audio_streams.create(current_user['_id'], mime_type.split(";")[0])
+    await websocket.send_json({"stream_id": stream.stream_id})
+
+    # Binary messages are encoded audio chunks, the text message "end" finishes the answer.
+    # Progress (partial transcript and metrics) is sent back whenever it changes
+    sent_version = 0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                await stream.feed(message["bytes"])
+            elif message.get("text") == "end":
+                await stream.finish()
+                await websocket.send_json(stream.snapshot())
+                break
+
+            if stream.version != sent_version:
+                sent_version = stream.version
+                await websocket.send_json(stream.snapshot())
+    except WebSocketDisconnect:
+        # The stream stays open, /save-video finishes it
+        pass
+    except (RuntimeError, OSError) as e:
+        # ffmpeg rejected the audio, the stream cannot be used
+        logger.error(f"Audio stream {stream.stream_id} failed: {str(e)}")
+        await audio_streams.discard(stream.stream_id)
+        await websocket.send_json({"stream_id": stream.stream_id, "error": str(e)})
+        await websocket.close(code=1011)
+
+
+async def store_gesture_feedback(user_id: str, quiz_id: str, question: str, video_url: str, cache_key: str, gesture_feedback: dict):
+    await gesture_cache.set(cache_key, gesture_feedback)
+    # Dropped by the database when the question was re-recorded meanwhile
+    await Database.save_gesture_feedback(user_id, quiz_id, question, video_url, gesture_feedback)
+
+
+@router_record.get("/cache-stats")
+async def get_cache_stats(
+    current_user: dict = Depends(get_current_user)
+):
+    return {"assessment": assessment_cache.stats, "gesture": gesture_cache.stats}
+
+
+@router_record.get("/gesture-jobs/{job_id}")
+async def get_gesture_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    job = gesture_jobs.get(job_id, owner=current_user['_id'])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {key: value for key, value in job.items() if key not in ("owner", "result")}
+
+
+@router_record.get("/gesture-jobs/{job_id}/result")
+async def get_gesture_job_result(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    job = gesture_jobs.get(job_id, owner=current_user['_id'])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
 
 
 @router_record.get("/history")
@@ -221,8 +330,12 @@ async def download_report(
     current_user: dict = Depends(get_current_user)
 ):
     try:
-        graph_from_gemini = get_graph_data(request.feedbacks)
-        pdf_path = generate_feedback_report(request.feedbackData, request.feedbacks, request.questions, graph_from_gemini, current_user["full_name"], "assessment_report.pdf")
+        # Counts, rates and acoustic measurements come straight from the stored feedbacks,
+        # the model only scores the qualitative series
+        graph_data = measured_graph_data(request.feedbacks)
+        if REPORT_QUALITATIVE_GRAPHS:
+            graph_data.update(await get_graph_data(request.feedbacks))
+        pdf_path = generate_feedback_report(request.feedbackData, request.feedbacks, request.questions, graph_data, current_user["full_name"], "assessment_report.pdf")
 
         return FileResponse(
             path=pdf_path,
@@ -238,7 +351,7 @@ async def get_learn_prompts(
     current_user: dict = Depends(get_current_user)
 ):
     # use the get_learning_from_input function to get the learning from the prompt
-    learning = get_learning_from_input(prompt.input)
+    learning = await get_learning_from_input(prompt.input)
     print(learning)
     return learning
 
@@ -259,7 +372,7 @@ async def get_learn_history(
             formatted_history += f"Feedback: {data[1]}\n"
     
     # Get learning plan using Gemini
-    learning_plan = get_learning_from_feedbacks(formatted_history)
+    learning_plan = await get_learning_from_feedbacks(formatted_history)
     print(learning_plan)
     
     return learning_plan
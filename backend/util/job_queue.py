@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from uuid import uuid4
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+
+class LocalJobBackend:
+    """
+    Runs jobs in a local process (or thread) pool, no external broker needed
+
+    A broker-backed backend only has to provide the same start/run/shutdown
+    coroutines to be swapped in.
+    """
+
+    def __init__(self, max_workers, use_processes=True):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.executor = None
+
+    def start(self):
+        if self.executor is not None:
+            return
+        if self.use_processes:
+            # Spawned workers start from a clean interpreter, which Mediapipe and TensorFlow require
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    async def run(self, func, *args):
+        """
+        Run func(*args) on the pool
+
+        A worker that dies (segfault, OOM kill) breaks a process pool for good, so
+        the pool is replaced. Jobs that were running in it fail, jobs submitted
+        after the break run on the new pool.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            future = loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Broken by another job, this one never started
+            executor = self._restart(executor)
+            future = loop.run_in_executor(executor, func, *args)
+
+        try:
+            return await future
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            raise RuntimeError("Worker process died while running the job") from e
+
+    def _restart(self, broken_executor):
+        # Concurrent jobs of the same broken pool only replace it once
+        if self.executor is broken_executor:
+            logger.error("Job worker process died, restarting the worker pool")
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.start()
+        return self.executor
+
+    async def shutdown(self):
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+            self.executor = None
+
+
+class JobQueue:
+    """
+    Background job queue with status tracking
+
+    Jobs move through queued -> running -> completed / failed. Finished jobs are
+    kept in memory (up to max_finished) so clients can poll for their result.
+    """
+
+    def __init__(self, backend, max_finished=1000):
+        self.backend = backend
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self._tasks = set()
+        self._slots = asyncio.Semaphore(backend.max_workers)
+
+    def start(self):
+        self.backend.start()
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.backend.shutdown()
+
+    async def warm_up(self, func, *args):
+        """
+        Run func(*args) once per worker slot, e.g. to load models before the first job
+
+        With a process backend this also starts the worker processes. Returns the
+        result of every call.
+        """
+        return await asyncio.gather(*(
+            self.backend.run(func, *args) for _ in range(self.backend.max_workers)
+        ))
+
+    def submit(self, func, *args, owner=None, on_complete=None):
+        """
+        Queue func(*args) on the backend
+
+        Args:
+            owner (str): User the job belongs to, checked when the job is read
+            on_complete (coroutine function): Awaited with the result once the job succeeds
+
+        Returns:
+            str: Job id
+        """
+        job_id = str(uuid4())
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "owner": owner,
+            "status": "queued",
+            "created_at": datetime.utcnow(),
+            "finished_at": None,
+            "error": None,
+            "result": None
+        }
+        self._prune()
+
+        task = asyncio.create_task(self._run(job_id, func, args, on_complete))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    def add_completed(self, result, owner=None):
+        """
+        Record a job whose result is already known, e.g. served from a cache
+
+        Returns:
+            str: Job id
+        """
+        job_id = str(uuid4())
+        now = datetime.utcnow()
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "owner": owner,
+            "status": "completed",
+            "created_at": now,
+            "finished_at": now,
+            "error": None,
+            "result": result
+        }
+        self._prune()
+        return job_id
+
+    def get(self, job_id, owner=None):
+        """
+        Return the job record, or None if it does not exist or belongs to another owner
+        """
+        job = self.jobs.get(job_id)
+        if job is None or (owner is not None and job["owner"] != owner):
+            return None
+        return job
+
+    async def _run(self, job_id, func, args, on_complete):
+        job = self.jobs[job_id]
+        try:
+            async with self._slots:
+                job["status"] = "running"
+                result = await self.backend.run(func, *args)
+            if on_complete is not None:
+                await on_complete(result)
+            job["result"] = result
+            job["status"] = "completed"
+        except asyncio.CancelledError:
+            job["status"] = "failed"
+            job["error"] = "cancelled"
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = datetime.utcnow()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("completed", "failed")]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self.jobs[job_id]
+
+
+gesture_jobs = JobQueue(
+    LocalJobBackend(
+        max_workers=config('GESTURE_JOB_WORKERS', default=2, cast=int),
+        use_processes=config('GESTURE_JOB_PROCESSES', default=True, cast=bool)
+    )
+)
@@ -4,14 +4,16 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.units import inch
 from datetime import datetime
-import matplotlib.pyplot as plt
 import numpy as np
 
 def create_parameter_graphs(graph_data):
+    # matplotlib is only loaded when a report is actually rendered
+    import matplotlib.pyplot as plt
+
     graphs = []
-    attempts = [1, 2, 3, 4, 5]  # Explicit attempt numbers
     
     for param, values in graph_data.items():
+        attempts = list(range(1, len(values) + 1))  # Explicit attempt numbers
         plt.figure(figsize=(8, 4))
         
         plt.plot(attempts, values, marker='o', linewidth=2)
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+
+from decouple import config
+
+
+class ResultCache:
+    """
+    Content-addressed cache for assessment results
+
+    Keys are hashes of the uploaded bytes plus everything that changes the
+    result (question, analyzer config and version). Lookups go through an
+    in-memory LRU, a bounded disk spill of the entries evicted from memory,
+    and optionally a Mongo collection with TTL eviction.
+    """
+
+    def __init__(self, name, max_entries=256, spill_dir=None, max_spill_entries=4096):
+        """
+        Args:
+            name (str): Namespace of the cache, part of every key
+            max_entries (int): Entries kept in memory
+            spill_dir (str): Directory for entries evicted from memory, None disables the disk tier
+            max_spill_entries (int): Files kept in the spill directory
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.max_spill_entries = max_spill_entries
+        self.collection = None
+
+        self._memory = OrderedDict()
+        # Keys in the spill directory, oldest write first
+        self._spilled = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "stores": 0
+        }
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            # Entries spilled by earlier runs, listed once instead of on every eviction
+            paths = [os.path.join(spill_dir, name) for name in os.listdir(spill_dir) if name.endswith('.json')]
+            for path in sorted(paths, key=os.path.getmtime):
+                self._spilled[os.path.basename(path)[:-len('.json')]] = None
+
+    def make_key(self, *parts):
+        """
+        Hash bytes, strings and JSON-serializable parts into a cache key
+        """
+        digest = hashlib.sha256(self.name.encode())
+        for part in parts:
+            if isinstance(part, (bytes, bytearray, memoryview)):
+                data = bytes(part)
+            elif isinstance(part, str):
+                data = part.encode()
+            else:
+                data = json.dumps(part, sort_keys=True, default=str).encode()
+            # Length prefix keeps ("ab", "c") and ("a", "bc") apart
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    async def attach_mongo(self, collection, ttl_seconds):
+        """
+        Enable the shared Mongo tier, documents expire ttl_seconds after they are stored
+        """
+        await collection.create_index("created_at", expireAfterSeconds=ttl_seconds)
+        self.collection = collection
+
+    async def get(self, key):
+        """
+        Return the cached value for key, or None on a miss
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return self._memory[key]
+
+        if self.spill_dir:
+            value = await asyncio.to_thread(self._read_spill, key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                await self._remember(key, value)
+                return value
+
+        if self.collection is not None:
+            document = await self.collection.find_one({"_id": key})
+            if document is not None:
+                self.stats["mongo_hits"] += 1
+                await self._remember(key, document["value"])
+                return document["value"]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key, value):
+        """
+        Store value in every enabled tier
+        """
+        self.stats["stores"] += 1
+        await self._remember(key, value)
+        if self.collection is not None:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "cache": self.name, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+
+    async def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        evicted = []
+        while len(self._memory) > self.max_entries:
+            evicted.append(self._memory.popitem(last=False))
+        if not evicted or not self.spill_dir:
+            return
+
+        # Disk writes run off the event loop, the bookkeeping stays on it
+        written = await asyncio.to_thread(self._write_spill, evicted)
+        for evicted_key in written:
+            self._spilled[evicted_key] = None
+            self._spilled.move_to_end(evicted_key)
+        removed = []
+        while len(self._spilled) > self.max_spill_entries:
+            removed.append(self._spilled.popitem(last=False)[0])
+        if removed:
+            await asyncio.to_thread(self._remove_spill, removed)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.json")
+
+    def _read_spill(self, key):
+        try:
+            with open(self._spill_path(key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_spill(self, entries):
+        """
+        Write evicted (key, value) pairs to the spill directory, return the keys written
+        """
+        written = []
+        for key, value in entries:
+            try:
+                with open(self._spill_path(key), 'w') as f:
+                    json.dump(value, f)
+            except (TypeError, ValueError, OSError):
+                # Values that cannot be serialized simply stay out of the disk tier
+                continue
+            written.append(key)
+        return written
+
+    def _remove_spill(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._spill_path(key))
+            except FileNotFoundError:
+                pass
+
+
+CACHE_DIR = config('RESULT_CACHE_DIR', default='.cache/results')
+CACHE_MEMORY_ENTRIES = config('RESULT_CACHE_MEMORY_ENTRIES', default=256, cast=int)
+CACHE_MONGO_TTL_SECONDS = config('RESULT_CACHE_MONGO_TTL_SECONDS', default=0, cast=int)
+
+assessment_cache = ResultCache(
+    'assessment',
+    max_entries=CACHE_MEMORY_ENTRIES,
+    spill_dir=os.path.join(CACHE_DIR, 'assessment')
+)
+gesture_cache = ResultCache(
+    'gesture',
+    max_entries=CACHE_MEMORY_ENTRIES,
+    spill_dir=os.path.join(CACHE_DIR, 'gesture')
+)
+
+
+async def attach_mongo_caches(database):
+    """
+    Enable the Mongo tier of the shared caches when a TTL is configured
+    """
+    if CACHE_MONGO_TTL_SECONDS <= 0:
+        return
+    for cache in (assessment_cache, gesture_cache):
+        await cache.attach_mongo(database.result_cache, CACHE_MONGO_TTL_SECONDS)